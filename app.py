@@ -1,18 +1,28 @@
+import collections
 import os
-import glob
+import threading
+import time
 import pandas as pd
-from datetime import datetime
 import dash
-from dash import dcc, html, dash_table
-import plotly.express as px
-import plotly.graph_objects as go
+import flask
+from dash import dcc, html, dash_table, ctx, Input, Output, State, no_update
 import numpy as np
 from scipy import stats
 
-import xml.etree.ElementTree as ET
-
-import plotly.express as px
-import plotly.graph_objects as go
+from dmt_cache import ParseCache
+from dmt_figures import boxplot_figure, radius_figure, scatter_figure, wafer_map_figure
+from dmt_frames import concat_frames, concat_ingested, label_columns
+from dmt_index import filter_file_index
+from dmt_ingest import ingest_files
+from dmt_metrics import metrics
+from dmt_profile import ProfileCache
+from dmt_query import (FILTER_COLUMNS, NO_FILTERS, file_mask, filter_key, filter_mask, filter_options, memoize_version,
+                       site_filters)
+from dmt_store import UNDATED, SiteStore
+from dmt_summary import GOF_THRESHOLD, summarize
+from dmt_table import IndexedTable
+from dmt_wafermap import MAP_LABELS, WaferMapCache
+from dmt_watch import DirectoryWatcher
 
 # Directories to search
 dirs = [r'Y:\Xfile\DMT102', r'Y:\Xfile\DMT103']
@@ -20,128 +30,326 @@ patterns = ['*2025-07-10T10.55.11.4384801-LN1720E040-8281-DMT103-TBH202-DMTDUMMY
 #patterns = ['*2025-07-09T16.22.47.7943672-LN1720E038-8281-DMT102-TZH591-DMTDUMMY.xml', 
 #            '2025-07-10T09.42.47.5955145-LN1718SS44-8333-DMT103-TZH591-DMTDUMMY.xml']
 
-# Get all files
-files = []
-for d in dirs:
-    for pattern in patterns:
-        files.extend(glob.glob(os.path.join(d, pattern)))
+# Number of worker processes used to parse XML files (1 = parse serially)
+ingest_workers = os.cpu_count() or 1
+
+# Parsed rows are cached here so restarts only parse new or changed files
+# (set to None to always parse everything)
+cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.dmt_cache')
+
+# Parsed rows are stored in a Parquet dataset here instead, partitioned by
+# DMT tool and day, and only the last memory_days days (counted back from
+# the newest file) are kept in memory. Picking earlier dates in the filters
+# reads just those tools' and days' rows back from disk. Takes the place of
+# the parse cache (None = keep all the data in memory)
+store_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.dmt_store')
+memory_days = 14
+
+# XML parser engine: 'etree' (standard library, the reference), 'lxml' (if
+# installed) or 'scan' (byte-level scanner, fastest); all give the same rows
+parser_engine = 'scan'
+
+# Threads reading XML files ahead of the parser, so the share's latency
+# overlaps with parsing (0 = read each file when it is parsed); at most
+# about read_ahead_mb of read but unparsed files are held in memory
+read_threads = 8
+read_ahead_mb = 256
+
+# Filename filters applied before any file is opened (None = don't filter)
+start_date = None   # e.g. '2025-07-01'; compared with the timestamp in the file name
+end_date = None
+lot_ids = None      # e.g. ['W525T8V0']
+operations = None   # e.g. ['8333']
+tools = None        # e.g. ['DMT102']
+
+# Sites with a Goodness-of-Fit below this are counted in the summary
+gof_threshold = GOF_THRESHOLD
+
+# 'summary' computes the boxplot quartiles, whiskers and outliers on the
+# server and sends only those; 'points' sends every point to the browser
+boxplot_mode = 'summary'
+# Inlier points randomly sampled onto each summary boxplot (0 = outliers only)
+boxplot_sample_points = 500
+
+# The GoF vs thickness scatter switches to WebGL above scatter_webgl_points
+# sites and samples them down to scatter_max_points (always keeping low GoF
+# sites); with more than scatter_density_points sites in view it shows a
+# density heatmap instead. Zooming re-queries the sites inside the new view.
+scatter_webgl_points = 5000
+scatter_max_points = 50000
+scatter_density_points = 500000
+
+# Draw each wafer's fitted radial thickness profile (a smoothing spline per
+# wafer and file) over its points in the RADIUS plots
+radius_profiles = True
+
+# Wafer maps interpolate each wafer's sites onto a grid over the wafer;
+# drawn as a 'heatmap' or 'contour' plot
+wafer_map_style = 'heatmap'
+
+# Timing, count and memory metrics of the loading stages, the section
+# builders and the callbacks are served as JSON on this route of the Flask
+# server (None = off); debug_panel adds a live table of them to the page
+metrics_route = '/metrics'
+debug_panel = False
+
+# The filtered sites behind the sections are memoized per filter state; each
+# of those memos (filtered rows, rows with a label, paired sites) keeps at
+# most this many MB of rows, so wide filters reading history back from the
+# store don't stay in memory
+query_cache_mb = 256
+
+# Number of wafers per page in the per-wafer sections
+wafers_per_page = 10
+
+# Load the data in a background thread so the server answers right away;
+# set to False to load everything before the app starts serving
+background_loading = True
+
+# Restart the development server when the source changes (python app.py
+# runs it in debug mode); only the restarted serving process loads data
+use_reloader = True
+
+# Check the directories for new XML files every watch_interval seconds and
+# add them to the loaded data (None = don't watch)
+watch_interval = 30
+
+watcher = DirectoryWatcher(dirs)
+
+# Radial profiles are fitted once per wafer and file and kept across data
+# versions, up to the 20000 most recently drawn
+profile_cache = ProfileCache(max_profiles=20000)
+
+# Wafer maps are interpolated once per wafer, file and label
+wafer_map_caches = {label: WaferMapCache(label) for label in MAP_LABELS}
+
+
+def select_files(file_index):
+    """Apply the filename filters to a file index"""
+    return filter_file_index(file_index, patterns=patterns,
+                             start=start_date, end=end_date, lots=lot_ids,
+                             operations=operations, tools=tools)
+
+
+def make_cache():
+    if (store_dir or cache_dir) and not ParseCache.available():
+        print("pyarrow is not installed; parsing without the parse cache")
+    elif store_dir:
+        return SiteStore(store_dir, window_days=memory_days)
+    elif cache_dir:
+        return ParseCache(cache_dir)
+    return None
+
+
+def evict_old_rows(df, files):
+    """Drop the rows of days that fell out of the store's window (a no-op without the store)"""
+    return df if cache is None else cache.evict(df, files)
+
+
+def load_data():
+    """Find and ingest the XML files, returning the data frame and processed files"""
+    # One directory listing per folder, then filter on the filename metadata
+    with metrics.span('discovery') as counts:
+        files = select_files(watcher.scan())['full_path'].tolist()
+        counts['files'] = len(files)
+
+    print(f"Found {len(files)} XML files to process")
+
+    # Collect data
+    return ingest_files(files, workers=ingest_workers, cache=cache, engine=parser_engine,
+                        read_threads=read_threads, read_ahead_mb=read_ahead_mb)
+
+
+# The loaded site rows and files table; version counts appends by the watcher
+# and keys the memoized queries (see memoize_version)
+LoadedData = collections.namedtuple('LoadedData', ['version', 'df', 'files'])
 
-print(f"Found {len(files)} XML files to process")
 
-# Collect data
-records = []
-processed_files = []  # Track successfully processed files
+# Filled in by load_in_background; sections render once data_ready is set.
+# data is only ever replaced as a whole, so a callback that reads it once
+# works on one consistent version, frame and files table. data_changes[v]
+# holds the labels that changed going from version v to v + 1.
+data = None
+load_error = None
+data_ready = threading.Event()
+data_changes = []
+cache = None
 
-for file in files:
+
+def load_in_background():
+    global data, load_error, cache
     try:
-        # Get file datetime (last modified)
-        file_time = datetime.fromtimestamp(os.path.getmtime(file))
-        
-        # Determine DMT type from file path
-        if 'DMT102' in file:
-            dmt = 'DMT102'
-        elif 'DMT103' in file:
-            dmt = 'DMT103'
-        else:
-            dmt = 'Unknown'
-            
-        # Parse XML
-        tree = ET.parse(file)
-        root = tree.getroot()
-        # Looking for DataRecord elements with Label and Datum children
-        for data_record in root.findall('.//DataRecord'):
-            label = data_record.findtext('Label')
-            datum = data_record.findtext('Datum')
-            wafer_id = data_record.findtext('WaferID')
-            x_wafer_loc = data_record.findtext('XWaferLoc')
-            y_wafer_loc = data_record.findtext('YWaferLoc')
-            
-            if label in ['Layer 1 Thickness', 'Goodness-of-Fit']:
-                try:
-                    datum_val = float(datum)
-                    # Create a unique location identifier for pairing measurements
-                    location_id = f"{x_wafer_loc}_{y_wafer_loc}" if x_wafer_loc and y_wafer_loc else None
-                    
-                    # Calculate RADIUS
-                    radius = None
-                    if x_wafer_loc and y_wafer_loc:
-                        try:
-                            x_val = float(x_wafer_loc)
-                            y_val = float(y_wafer_loc)
-                            radius = np.sqrt(x_val**2 + y_val**2)
-                        except (ValueError, TypeError):
-                            radius = None
-                    
-                    records.append({
-                        'datetime': file_time,
-                        'Label': label,
-                        'Datum': datum_val,
-                        'dmt': dmt,
-                        'WaferID': wafer_id,
-                        'XWaferLoc': x_wafer_loc,
-                        'YWaferLoc': y_wafer_loc,
-                        'location_id': location_id,
-                        'RADIUS': radius
-                    })
-                except (TypeError, ValueError):
-                    continue
-        
-        # Add to processed files list if we got here without errors
-        processed_files.append({
-            'filename': os.path.basename(file),
-            'full_path': file,
-            'dmt_type': dmt,
-            'file_datetime': file_time.strftime('%Y-%m-%d %H:%M:%S')
-        })
-        
+        cache = make_cache()
+        data = LoadedData(0, *load_data())
     except Exception as e:
-        print(f"Error processing file {file}: {e}")
-        continue
+        print(f"Error loading data: {e}")
+        load_error = str(e)
+    finally:
+        data_ready.set()
+
+
+def append_new_files():
+    """Parse files that appeared since the last poll and append their rows"""
+    global data
+    current = data
+    with metrics.span('poll') as counts:
+        new_index = select_files(watcher.poll())
+        counts['files'] = len(new_index)
+    if new_index.empty:
+        return
+
+    print(f"Found {len(new_index)} new XML files")
+    new_df, new_files = ingest_files(new_index['full_path'].tolist(), workers=ingest_workers, cache=cache,
+                                     engine=parser_engine, read_threads=read_threads, read_ahead_mb=read_ahead_mb)
+    watcher.retry(new_index[~new_index['full_path'].isin(new_files['full_path'])])
+    if new_files.empty:
+        return
+
+    with metrics.span('append', files=len(new_files), sites=len(new_df)):
+        df, files = concat_ingested([(current.df, current.files), (new_df, new_files)])
+        kept = evict_old_rows(df, files)
+    # Evicting old days changes every label's data
+    data_changes.append(set(label_columns(new_df)) | (set(label_columns(df)) if len(kept) < len(df) else set()))
+    data = LoadedData(current.version + 1, kept, files)
+
+
+def watch_for_new_files():
+    data_ready.wait()
+    while load_error is None:
+        time.sleep(watch_interval)
+        try:
+            append_new_files()
+        except Exception as e:
+            print(f"Error checking for new files: {e}")
+
 
-df = pd.DataFrame(records)
+def serving_process():
+    """False in processes that must not search and parse.
+
+    Ingest workers started with spawn (Windows) re-run this script as
+    __mp_main__, and with the reloader the script run as __main__ only
+    watches the source files; it serves from a child process it starts with
+    WERKZEUG_RUN_MAIN set, which is the one that should load the data.
+    """
+    if __name__ == '__mp_main__':
+        return False
+    return not (__name__ == '__main__' and use_reloader and os.environ.get('WERKZEUG_RUN_MAIN') != 'true')
+
+
+if serving_process():
+    if background_loading:
+        threading.Thread(target=load_in_background, name='dmt-loader', daemon=True).start()
+    else:
+        load_in_background()
+    if watch_interval:
+        threading.Thread(target=watch_for_new_files, name='dmt-watcher', daemon=True).start()
 
 # Dash app
-app = dash.Dash(__name__)
+# Some callbacks target components (like the scatter graph) that sections create
+app = dash.Dash(__name__, suppress_callback_exceptions=True)
+
+# Each callback request is timed as a 'callback:<output>' span, which
+# includes serializing the figures it returns
+@app.server.before_request
+def start_request_timer():
+    flask.g.request_start = time.perf_counter()
+
+@app.server.after_request
+def record_callback_time(response):
+    if flask.request.path.endswith('/_dash-update-component'):
+        output = (flask.request.get_json(silent=True) or {}).get('output')
+        metrics.add(f'callback:{output}', time.perf_counter() - flask.g.request_start,
+                    error=response.status_code >= 400, bytes=response.content_length or 0)
+    return response
+
+def metrics_snapshot():
+    """Metrics snapshot plus the size of the loaded data"""
+    snapshot = metrics.snapshot()
+    current = data
+    snapshot['data'] = {
+        'ready': data_ready.is_set(),
+        'version': 0 if current is None else current.version,
+        'files': 0 if current is None else len(current.files),
+        'sites': 0 if current is None else len(current.df),
+        'window_start': (str(cache.window_start(current.files))
+                         if isinstance(cache, SiteStore) and current is not None else None),
+        'cached_profiles': len(profile_cache),
+        'cached_wafer_maps': sum(len(maps) for maps in wafer_map_caches.values()),
+    }
+    return snapshot
+
+if metrics_route:
+    @app.server.route(metrics_route)
+    def metrics_json():
+        return flask.jsonify(metrics_snapshot())
+
+@memoize_version(maxsize=16, max_bytes=query_cache_mb * 2**20)
+def filtered_rows(data, filters):
+    """Sites of the LoadedData matching a filter_key; memoized per data version and filter state.
 
-def make_boxplot(label):
-    dff = df[df['Label'] == label]
+    With the store, the matching files whose days are no longer in memory
+    are read back from disk (only their sites matching the site filters,
+    like WaferID); unfiltered, just the in-memory window is used.
+    """
+    df, files = data.df, data.files
+    if filters == NO_FILTERS:
+        return df
+    rows = df[filter_mask(df, files, filters)]
+    if isinstance(cache, SiteStore):
+        older = cache.query(files, file_mask(files, filters), where=site_filters(files, filters))
+        older = older[filter_mask(older, files, filters)]
+        if len(older):
+            rows = concat_frames([older, rows])
+    return rows
+
+@memoize_version(maxsize=32, max_bytes=query_cache_mb * 2**20)
+def label_rows(data, filters, label):
+    """Filtered sites that have a value for label"""
+    rows = filtered_rows(data, filters)
+    if label not in rows.columns:
+        return rows.iloc[:0]
+    return rows[rows[label].notna()]
+
+@metrics.timed()
+def make_box_figure(rows, files, label, title):
+    """Boxplot of label over file time, colored by DMT, in the configured boxplot_mode"""
+    return boxplot_figure(rows, files, label, title, mode=boxplot_mode, sample_points=boxplot_sample_points)
+
+@metrics.timed()
+def make_boxplot(data, label, filters=NO_FILTERS):
+    dff = label_rows(data, filters, label)
     if dff.empty:
         return html.Div(f"No data for {label}")
-    fig = px.box(
-        dff,
-        x=dff['datetime'].dt.strftime('%Y-%m-%d %H:%M:%S'),
-        y='Datum',
-        color='dmt',
-        points='all',
-        title=f'Boxplot of {label} over Time',
-        labels={'Datum': label, 'datetime': 'File DateTime', 'dmt': 'DMT Type'}
-    )
-    fig.update_layout(xaxis_title='File DateTime', yaxis_title=label)
+    fig = make_box_figure(dff, data.files, label, f'Boxplot of {label} over Time')
     return dcc.Graph(figure=fig)
 
-def make_wafer_plots(label):
-    dff = df[df['Label'] == label]
-    if dff.empty:
-        return html.Div(f"No data for {label}")
-    
-    unique_wafers = sorted(dff['WaferID'].unique())
+@memoize_version(maxsize=16)
+def wafer_rows(data, filters, label, with_radius=False, min_sites=1):
+    """Row positions in filtered_rows of each wafer's sites that have a value for label.
+
+    The frame is grouped once per data version and filter state, so paging
+    through wafers only takes the rows of the wafers on the page.
+    """
+    rows = filtered_rows(data, filters)
+    dff = label_rows(data, filters, label)
+    if with_radius:
+        dff = dff[dff['RADIUS'].notna()]
+    positions = rows.index.get_indexer(dff.index)
+    groups = dff.groupby('WaferID', observed=True).indices
+    return {wafer_id: positions[groups[wafer_id]] for wafer_id in sorted(groups) if len(groups[wafer_id]) >= min_sites}
+
+@metrics.timed()
+def make_wafer_plots(data, label, wafer_ids, filters=NO_FILTERS):
+    """Boxplots of label over time for the given wafers"""
+    rows = filtered_rows(data, filters)
+    groups = wafer_rows(data, filters, label)
     plots = []
     
-    for wafer_id in unique_wafers:
-        wafer_data = dff[dff['WaferID'] == wafer_id]
-        if not wafer_data.empty:
-            fig = px.box(
-                wafer_data,
-                x=wafer_data['datetime'].dt.strftime('%Y-%m-%d %H:%M:%S'),
-                y='Datum',
-                color='dmt',
-                points='all',
-                title=f'{label} - WaferID: {wafer_id}',
-                labels={'Datum': label, 'datetime': 'File DateTime', 'dmt': 'DMT Type'}
-            )
+    for wafer_id in wafer_ids:
+        if wafer_id in groups:
+            wafer_data = rows.take(groups[wafer_id])
+            fig = make_box_figure(wafer_data, data.files, label, f'{label} - WaferID: {wafer_id}')
             fig.update_layout(
-                xaxis_title='File DateTime', 
-                yaxis_title=label,
                 height=400,
                 margin=dict(l=50, r=50, t=50, b=50)
             )
@@ -149,112 +357,155 @@ def make_wafer_plots(label):
     
     return html.Div(plots)
 
-def make_scatter_plot():
-    # Filter data that has location information for proper pairing
-    df_with_location = df[df['location_id'].notna()].copy()
-    
-    if df_with_location.empty:
-        return html.Div("No location data available for scatter plot")
-    
-    # Separate GoF and Thickness data
-    gof_data = df_with_location[df_with_location['Label'] == 'Goodness-of-Fit'][['datetime', 'WaferID', 'dmt', 'location_id', 'Datum']].rename(columns={'Datum': 'GoodnessOfFit'})
-    thickness_data = df_with_location[df_with_location['Label'] == 'Layer 1 Thickness'][['datetime', 'WaferID', 'dmt', 'location_id', 'Datum']].rename(columns={'Datum': 'Layer1Thickness'})
-    
-    # Merge based on location (same measurement point)
-    merged_data = pd.merge(gof_data, thickness_data, on=['datetime', 'WaferID', 'dmt', 'location_id'], how='inner')
-    
-    if merged_data.empty:
+@memoize_version(maxsize=16, max_bytes=query_cache_mb * 2**20)
+def paired_sites(data, filters):
+    """Filtered sites with both Goodness-of-Fit and Thickness"""
+    rows = filtered_rows(data, filters)
+    return rows[rows['Goodness-of-Fit'].notna() & rows['Layer 1 Thickness'].notna()]
+
+def paired_rows(data, filters=NO_FILTERS, window=None):
+    """Paired sites, optionally only those inside window = (GoF range,
+    Thickness range); a range of None doesn't limit that axis"""
+    paired = paired_sites(data, filters)
+    for label, limits in zip(('Goodness-of-Fit', 'Layer 1 Thickness'), window or ()):
+        if limits is not None:
+            paired = paired[paired[label].between(min(limits), max(limits))]
+    return paired
+
+@metrics.timed()
+def make_scatter_figure(data, filters=NO_FILTERS, window=None):
+    """Layer 1 Thickness vs Goodness-of-Fit for the filtered sites in window (all if None)"""
+    if 'Goodness-of-Fit' not in data.df.columns or 'Layer 1 Thickness' not in data.df.columns:
+        return None
+    
+    # Each row is one measurement point, so GoF and Thickness are already paired
+    paired = paired_rows(data, filters, window)
+    if paired.empty and window is None:
+        return None
+    
+    fig = scatter_figure(paired, data.files, gof_threshold=gof_threshold, webgl_points=scatter_webgl_points,
+                         max_points=scatter_max_points, density_points=scatter_density_points)
+    fig.update_layout(uirevision='scatter')
+    if window:
+        x_range, y_range = window
+        fig.update_layout(xaxis_range=x_range and list(x_range), yaxis_range=y_range and list(y_range))
+    
+    return fig
+
+@metrics.timed()
+def make_scatter_plot(data, filters=NO_FILTERS):
+    fig = make_scatter_figure(data, filters)
+    if fig is None:
         return html.Div("No paired measurement data available for scatter plot")
-    
-    fig = px.scatter(
-        merged_data,
-        x='GoodnessOfFit',
-        y='Layer1Thickness',
-        color='dmt',
-        symbol='WaferID',
-        title='Layer 1 Thickness vs Goodness-of-Fit (Same Measurement Points)',
-        labels={
-            'GoodnessOfFit': 'Goodness-of-Fit',
-            'Layer1Thickness': 'Layer 1 Thickness',
-            'dmt': 'DMT Type'
-        },
-        hover_data=['WaferID', 'datetime']
-    )
-    
-    fig.update_layout(
-        xaxis_title='Goodness-of-Fit',
-        yaxis_title='Layer 1 Thickness',
-        height=600,
-        margin=dict(l=50, r=50, t=50, b=50)
-    )
-    
-    return dcc.Graph(figure=fig)
+    return dcc.Graph(id='scatter-graph', figure=fig)
 
-def make_radius_thickness_plots():
-    # Filter for Layer 1 Thickness data with valid RADIUS
-    thickness_data = df[(df['Label'] == 'Layer 1 Thickness') & (df['RADIUS'].notna())].copy()
-    
-    if thickness_data.empty:
-        return html.Div("No Layer 1 Thickness data with RADIUS available")
-    
-    unique_wafers = sorted(thickness_data['WaferID'].unique())
+@metrics.timed()
+def make_radius_thickness_plots(data, wafer_ids, filters=NO_FILTERS):
+    """Layer 1 Thickness vs RADIUS for the given wafers, with their fitted profiles"""
+    rows = filtered_rows(data, filters)
+    groups = wafer_rows(data, filters, 'Layer 1 Thickness', with_radius=True, min_sites=3)
+    wafer_ids = [wafer_id for wafer_id in wafer_ids if wafer_id in groups]
+    profiles = {}
+    if radius_profiles and wafer_ids:
+        # One batch fit for the page's wafers that aren't in the cache yet
+        page = rows.take(np.concatenate([groups[wafer_id] for wafer_id in wafer_ids]))
+        table, curves = profile_cache.get(page, data.files)
+        for wafer_id, positions in table.groupby('WaferID').indices.items():
+            profiles[wafer_id] = (table.iloc[positions], curves[positions])
     plots = []
     
-    for wafer_id in unique_wafers:
-        wafer_data = thickness_data[thickness_data['WaferID'] == wafer_id].copy()
-        
-        if wafer_data.empty or len(wafer_data) < 3:
-            continue
-            
-        # Create scatter plot
-        fig = go.Figure()
-        
-        # Add scatter points colored by DMT type
-        for dmt_type in wafer_data['dmt'].unique():
-            dmt_data = wafer_data[wafer_data['dmt'] == dmt_type]
-            fig.add_trace(go.Scatter(
-                x=dmt_data['RADIUS'],
-                y=dmt_data['Datum'],
-                mode='markers',
-                name=f'{dmt_type}',
-                marker=dict(size=8),
-                text=dmt_data['datetime'].dt.strftime('%Y-%m-%d %H:%M:%S'),
-                hovertemplate='<b>%{fullData.name}</b><br>' +
-                              'RADIUS: %{x:.2f}<br>' +
-                              'Thickness: %{y:.2f}<br>' +
-                              'DateTime: %{text}<br>' +
-                              '<extra></extra>'
-            ))
-        
-        # Update layout
-        fig.update_layout(
-            title=f'Layer 1 Thickness vs RADIUS - WaferID: {wafer_id}',
-            xaxis_title='RADIUS',
-            yaxis_title='Layer 1 Thickness',
-            xaxis=dict(range=[0, 150]),
-            height=500,
-            margin=dict(l=50, r=50, t=50, b=50),
-            showlegend=True
-        )
-        
+    for wafer_id in wafer_ids:
+        wafer_data = rows.take(groups[wafer_id])
+        fig = radius_figure(wafer_data, data.files, wafer_id, profiles.get(wafer_id))
         plots.append(dcc.Graph(figure=fig))
     
     return html.Div(plots)
 
-def make_files_table():
-    """Create a table showing all processed XML files"""
-    if not processed_files:
-        return html.Div("No files were processed")
+@metrics.timed()
+def make_wafer_maps(data, wafer_ids, filters=NO_FILTERS):
+    """Thickness and GoF maps of the given wafers, one row of maps per wafer and file"""
+    rows = filtered_rows(data, filters)
+    groups = wafer_rows(data, filters, 'Layer 1 Thickness', with_radius=True, min_sites=3)
+    wafer_ids = [wafer_id for wafer_id in wafer_ids if wafer_id in groups]
+    if not wafer_ids:
+        return html.Div()
+    page = rows[rows['WaferID'].isin(wafer_ids)]
+    
+    # One batch of interpolations per label for the page's wafers not mapped yet
+    maps = {}
+    for label in MAP_LABELS:
+        if label in page.columns:
+            table, grids = wafer_map_caches[label].get(page, data.files)
+            for wafer, grid in zip(table.itertuples(index=False), grids):
+                maps[(wafer.WaferID, wafer.file_key, label)] = grid
+    
+    sites = page.groupby(['WaferID', 'file_key'], observed=True).indices
+    plots = []
+    for wafer_id in wafer_ids:
+        for file_key in sorted(key for wafer, key in sites if wafer == wafer_id):
+            wafer_sites = page.take(sites[(wafer_id, file_key)])
+            # Files without a ProcTime or a dated name have no date/time
+            when = data.files['datetime'].iloc[file_key]
+            when = UNDATED if pd.isna(when) else f'{when:%Y-%m-%d %H:%M}'
+            figures = [
+                wafer_map_figure(maps[(wafer_id, file_key, label)], label,
+                                 f'{label} - WaferID: {wafer_id} ({when})',
+                                 sites=wafer_sites[wafer_sites[label].notna()], style=wafer_map_style)
+                for label in MAP_LABELS if (wafer_id, file_key, label) in maps
+            ]
+            plots.append(html.Div([
+                html.Div(dcc.Graph(figure=fig), style={'width': '50%', 'display': 'inline-block'})
+                for fig in figures
+            ]))
     
-    # Create a DataFrame for the table
-    files_df = pd.DataFrame(processed_files)
+    return html.Div(plots)
+
+@memoize_version(maxsize=16)
+def filtered_files(data, filters):
+    """Files with sites matching a filter_key (all processed files if unfiltered)"""
+    if filters == NO_FILTERS:
+        return data.files
+    keys = np.unique(filtered_rows(data, filters)['file_key'].to_numpy())
+    return data.files.iloc[keys]
+
+def table_page(table, page, page_size, sort_by, filter_query):
+    """Records of one DataTable page from an IndexedTable, and the number of pages"""
+    page_size = page_size or 20
+    rows, total = table.query(filter_query, sort_by, page or 0, page_size)
+    return rows.to_dict('records'), max(1, -(-total // page_size))
+
+@memoize_version(maxsize=16)
+def files_table(data, filters):
+    """Indexed rows of the processed files table for a data version and filter state"""
+    files = filtered_files(data, filters)
+    return IndexedTable(pd.DataFrame({
+        'filename': files['filename'],
+        'full_path': files['full_path'],
+        'dmt_type': files['dmt'].astype(str),
+        'lot_id': files['LotID'].astype(object).fillna(''),
+        'recipe': files['RecipeName'].astype(object).fillna(''),
+        'file_datetime': files['datetime'].dt.strftime('%Y-%m-%d %H:%M:%S')
+    }))
+
+@metrics.timed()
+def make_files_table(data, filters=NO_FILTERS):
+    """Create a table showing all processed XML files.
+
+    The table pages, sorts and filters on the server (page_files_table), so
+    only the rows of the visible page are sent to the browser.
+    """
+    if data.files.empty:
+        return html.Div("No files were processed")
+    files = files_table(data, filters)
     
     # Create the table using dash_table
     table = dash_table.DataTable(
-        data=files_df.to_dict('records'),
+        id='files-table-data',
         columns=[
             {"name": "File Name", "id": "filename"},
             {"name": "DMT Type", "id": "dmt_type"},
+            {"name": "Lot ID", "id": "lot_id"},
+            {"name": "Recipe", "id": "recipe"},
             {"name": "File Date/Time", "id": "file_datetime"},
             {"name": "Full Path", "id": "full_path"}
         ],
@@ -278,62 +529,66 @@ def make_files_table():
                 'backgroundColor': 'rgba(173, 216, 230, 0.3)',
             }
         ],
+        page_current=0,
         page_size=20,
-        sort_action="native",
-        filter_action="native"
+        page_action="custom",
+        sort_action="custom",
+        sort_mode="multi",
+        sort_by=[],
+        filter_action="custom",
+        filter_query=''
     )
     
     return html.Div([
-        html.H3(f"Processed XML Files ({len(processed_files)} total)"),
+        html.H3(f"Processed XML Files ({len(files)} of {len(data.files)} total)"),
         table
     ])
 
-def make_statistical_summary_table():
-    """Create a statistical summary table showing mean and std dev for each WaferID"""
-    if df.empty:
+# Groupings offered for the statistical summary
+SUMMARY_GROUPS = {'WaferID': 'Wafer ID', 'dmt': 'DMT Type', 'LotID': 'Lot ID', 'RecipeName': 'Recipe', 'day': 'Day'}
+
+@memoize_version(maxsize=16)
+def cached_summary(data, filters, group_by):
+    """Summary for a data version, filter state and grouping; reused until the data changes"""
+    return summarize(filtered_rows(data, filters), data.files, by=group_by, gof_threshold=gof_threshold)
+
+def summary_stat_columns(summary, group_by):
+    return [column for column in summary.columns if column not in group_by and column != 'Measurement']
+
+@memoize_version(maxsize=16)
+def summary_table(data, filters, group_by):
+    """Indexed, rounded summary rows for a data version, filter state and grouping"""
+    summary = cached_summary(data, filters, group_by)
+    stat_columns = summary_stat_columns(summary, group_by)
+    return IndexedTable(summary.round({column: 4 for column in stat_columns if column not in ('Count', 'Low GoF')}))
+
+@metrics.timed()
+def make_statistical_summary_table(data, group_by=('WaferID',), filters=NO_FILTERS):
+    """Create a statistical summary table for each measurement type per group.
+
+    Like the files table, it is paged, sorted and filtered on the server.
+    """
+    if filtered_rows(data, filters).empty:
         return html.Div("No data available for statistical summary")
     
-    # Get unique labels and wafer IDs
-    unique_labels = sorted(df['Label'].unique())
-    unique_wafers = sorted(df['WaferID'].unique())
-    
-    summary_data = []
-    
-    for wafer_id in unique_wafers:
-        wafer_data = df[df['WaferID'] == wafer_id]
-        
-        for label in unique_labels:
-            label_data = wafer_data[wafer_data['Label'] == label]['Datum']
-            
-            if not label_data.empty:
-                mean_val = label_data.mean()
-                std_val = label_data.std()
-                count_val = len(label_data)
-                
-                summary_data.append({
-                    'WaferID': wafer_id,
-                    'Measurement': label,
-                    'Mean': round(mean_val, 4),
-                    'Std Dev': round(std_val, 4),
-                    'Count': count_val,
-                    'Min': round(label_data.min(), 4),
-                    'Max': round(label_data.max(), 4)
-                })
-    
-    if not summary_data:
+    group_by = tuple(group_by) or ('WaferID',)
+    summary = cached_summary(data, filters, group_by)
+    
+    if summary.empty:
         return html.Div("No statistical data to display")
     
+    stat_columns = summary_stat_columns(summary, group_by)
+    n_groups = len(summary[list(group_by)].drop_duplicates())
+    
     # Create the summary table using dash_table
     summary_table = dash_table.DataTable(
-        data=summary_data,
-        columns=[
-            {"name": "Wafer ID", "id": "WaferID"},
-            {"name": "Measurement Type", "id": "Measurement"},
-            {"name": "Mean", "id": "Mean", "type": "numeric", "format": {"specifier": ".4f"}},
-            {"name": "Std Dev", "id": "Std Dev", "type": "numeric", "format": {"specifier": ".4f"}},
-            {"name": "Count", "id": "Count", "type": "numeric"},
-            {"name": "Min", "id": "Min", "type": "numeric", "format": {"specifier": ".4f"}},
-            {"name": "Max", "id": "Max", "type": "numeric", "format": {"specifier": ".4f"}}
+        id='summary-table-data',
+        columns=[{"name": SUMMARY_GROUPS.get(column, column), "id": column} for column in group_by] + [
+            {"name": "Measurement Type", "id": "Measurement"}
+        ] + [
+            {"name": column, "id": column, "type": "numeric"} if column in ('Count', 'Low GoF')
+            else {"name": column, "id": column, "type": "numeric", "format": {"specifier": ".4f"}}
+            for column in stat_columns
         ],
         style_table={'overflowX': 'auto'},
         style_cell={
@@ -357,51 +612,352 @@ def make_statistical_summary_table():
                 'backgroundColor': 'rgba(173, 216, 230, 0.2)',
             }
         ],
-        sort_action="native",
-        filter_action="native",
-        page_size=30
+        page_current=0,
+        page_size=30,
+        page_action="custom",
+        sort_action="custom",
+        sort_mode="multi",
+        sort_by=[],
+        filter_action="custom",
+        filter_query=''
     )
     
     return html.Div([
-        html.H3(f"Statistical Summary by WaferID ({len(unique_wafers)} wafers)"),
-        html.P("Mean and standard deviation for each measurement type by wafer"),
+        html.H3(f"Statistical Summary by {', '.join(SUMMARY_GROUPS.get(g, g) for g in group_by)} ({n_groups} groups)"),
+        html.P(f"Statistics for each measurement type; Low GoF counts sites with Goodness-of-Fit below {gof_threshold}"),
         summary_table
     ])
 
+# Each section is rendered by its own callback once the data has loaded or
+# the filters change, together with the labels it shows (None = redraw on
+# every change). Builders get the LoadedData and the filter_key of the
+# current filters.
+SECTIONS = {
+    'boxplot-thickness': (lambda data, filters: make_boxplot(data, 'Layer 1 Thickness', filters), ['Layer 1 Thickness']),
+    'boxplot-gof': (lambda data, filters: make_boxplot(data, 'Goodness-of-Fit', filters), ['Goodness-of-Fit']),
+    'scatter': (make_scatter_plot, ['Layer 1 Thickness', 'Goodness-of-Fit']),
+    'files-table': (make_files_table, None),
+}
+
+def section(section_id):
+    """Placeholder for a section; filled in by render_section"""
+    return dcc.Loading(html.Div(id=section_id, children=html.Div("Loading data...")))
+
+# Per-wafer sections only build the figures of the wafers on the current
+# page (or picked in the wafer dropdown); wafers come from wafer_rows
+WAFER_SECTIONS = {
+    'radius-thickness': (make_radius_thickness_plots,
+                         lambda data, filters: wafer_rows(data, filters, 'Layer 1 Thickness', with_radius=True, min_sites=3),
+                         ['Layer 1 Thickness']),
+    'wafer-gof': (lambda data, wafer_ids, filters: make_wafer_plots(data, 'Goodness-of-Fit', wafer_ids, filters),
+                  lambda data, filters: wafer_rows(data, filters, 'Goodness-of-Fit'),
+                  ['Goodness-of-Fit']),
+    'wafer-map': (make_wafer_maps,
+                  lambda data, filters: wafer_rows(data, filters, 'Layer 1 Thickness', with_radius=True, min_sites=3),
+                  list(MAP_LABELS)),
+}
+
+def wafer_section(section_id):
+    """Page and wafer pickers plus the placeholder for the wafers' figures"""
+    return html.Div([
+        html.Div([
+            html.Div(dcc.Dropdown(id=f'{section_id}-page', clearable=False, placeholder='Page'),
+                     style={'width': '30%', 'display': 'inline-block'}),
+            html.Div(dcc.Dropdown(id=f'{section_id}-wafers', multi=True, placeholder='Show specific wafers'),
+                     style={'width': '65%', 'display': 'inline-block', 'marginLeft': '5%'})
+        ]),
+        section(section_id)
+    ])
+
+# Names shown on the filter pickers, one per FILTER_COLUMNS entry
+FILTER_NAMES = {'dmt': 'DMT Type', 'LotID': 'Lot ID', 'RecipeName': 'Recipe', 'WaferID': 'Wafer ID'}
+
+def filter_bar():
+    """Date range and value pickers; update_filters collects them into the 'filters' store"""
+    return html.Div([
+        dcc.DatePickerRange(id='filter-dates', clearable=True, display_format='YYYY-MM-DD'),
+        *[html.Div(dcc.Dropdown(id=f'filter-{name}', multi=True, placeholder=FILTER_NAMES[name]),
+                   style={'width': '17%', 'display': 'inline-block', 'marginLeft': '1%', 'verticalAlign': 'top'})
+          for name in FILTER_COLUMNS],
+        dcc.Store(id='filters', data={})
+    ])
+
+def debug_panel_section():
+    """Collapsible table of the metrics, refreshed by update_debug_panel"""
+    return html.Details([
+        html.Summary("Debug: timings and memory"),
+        dcc.Interval(id='metrics-poll', interval=5000),
+        html.Div(id='metrics-panel')
+    ])
+
 app.layout = html.Div([
     html.H1("XML Data Analysis"),
+    dcc.Interval(id='load-poll', interval=1000),
+    dcc.Store(id='data-status'),
+    html.Div(id='load-message'),
+    filter_bar(),
     
     html.H2("Overall Data - Layer 1 Thickness"),
-    make_boxplot('Layer 1 Thickness'),
+    section('boxplot-thickness'),
     
     html.H2("Overall Data - Goodness-of-Fit"),
-    make_boxplot('Goodness-of-Fit'),
+    section('boxplot-gof'),
     
     html.Hr(),
     
     html.H2("Layer 1 Thickness vs Goodness-of-Fit Correlation"),
-    make_scatter_plot(),
+    section('scatter'),
     
     html.Hr(),
     
     html.H2("Layer 1 Thickness vs RADIUS by WaferID"),
-    make_radius_thickness_plots(),
+    wafer_section('radius-thickness'),
     
     html.Hr(),
     
     html.H2("Goodness-of-Fit by WaferID"),
-    make_wafer_plots('Goodness-of-Fit'),
+    wafer_section('wafer-gof'),
+    
+    html.Hr(),
+    
+    html.H2("Wafer Maps - Layer 1 Thickness and Goodness-of-Fit"),
+    wafer_section('wafer-map'),
     
     html.Hr(),
     
     html.H2("Statistical Summary"),
-    make_statistical_summary_table(),
+    dcc.Dropdown(
+        id='summary-group-by',
+        options=[{'label': name, 'value': column} for column, name in SUMMARY_GROUPS.items()],
+        value=['WaferID'],
+        multi=True
+    ),
+    section('summary-table'),
     
     html.Hr(),
     
     html.H2("Processed XML Files"),
-    make_files_table()
+    section('files-table'),
+    
+    *([html.Hr(), debug_panel_section()] if debug_panel else [])
 ])
 
+@app.callback(
+    Output('data-status', 'data'),
+    Output('load-poll', 'disabled'),
+    Output('load-poll', 'interval'),
+    Output('load-message', 'children'),
+    Input('load-poll', 'n_intervals'),
+    State('data-status', 'data')
+)
+def poll_data(_, status):
+    """Publish the load state and any labels changed since the page last saw the data.
+
+    Polls every second while loading, then every watch_interval while the
+    watcher is on, and only updates the store (and so only re-renders
+    sections) when the data version has moved on.
+    """
+    if not data_ready.is_set():
+        return no_update, False, no_update, "Loading XML data..."
+    if load_error is not None:
+        return {'state': 'error'}, True, no_update, f"Error loading data: {load_error}"
+
+    current = data
+    interval = (watch_interval or 1) * 1000
+    seen = (status or {}).get('version')
+    if seen == current.version:
+        return no_update, not watch_interval, interval, no_update
+
+    labels = None if seen is None else sorted(set().union(*data_changes[seen:current.version]))
+    return ({'state': 'ready', 'version': current.version, 'labels': labels}, not watch_interval, interval,
+            f"Loaded {len(current.df)} records from {len(current.files)} files"
+            + (f" (the last {memory_days} days are in memory)" if isinstance(cache, SiteStore) else ""))
+
+@app.callback(
+    *[Output(f'filter-{name}', 'options') for name in FILTER_COLUMNS],
+    Output('filter-dates', 'min_date_allowed'),
+    Output('filter-dates', 'max_date_allowed'),
+    Input('data-status', 'data')
+)
+def update_filter_options(status):
+    """Offer the values and dates present in the loaded data"""
+    if not status or status['state'] != 'ready':
+        return (no_update,) * (len(FILTER_COLUMNS) + 2)
+    current = data
+    options = filter_options(current.df, current.files)
+    dates = current.files['datetime'].dropna()
+    first, last = (dates.min().date(), dates.max().date()) if len(dates) else (None, None)
+    return (*[options[name] for name in FILTER_COLUMNS], first, last)
+
+@app.callback(
+    Output('filters', 'data'),
+    Input('filter-dates', 'start_date'),
+    Input('filter-dates', 'end_date'),
+    *[Input(f'filter-{name}', 'value') for name in FILTER_COLUMNS]
+)
+def update_filters(start, end, *values):
+    """Collect the filter pickers into one filter state for the sections"""
+    return {'start': start and start[:10], 'end': end and end[:10], **dict(zip(FILTER_COLUMNS, values))}
+
+def register_section(section_id, builder, labels):
+    @app.callback(Output(section_id, 'children'), Input('data-status', 'data'), Input('filters', 'data'))
+    def render_section(status, filters):
+        if not status:
+            return no_update
+        if status['state'] != 'ready':
+            return html.Div("No data available")
+        changed = status.get('labels')
+        if (ctx.triggered_id == 'data-status' and changed is not None and labels is not None
+                and not set(labels) & set(changed)):
+            return no_update
+        return builder(data, filter_key(filters))
+
+for section_id, (builder, labels) in SECTIONS.items():
+    register_section(section_id, builder, labels)
+
+def register_wafer_section(section_id, builder, groups, labels):
+    @app.callback(
+        Output(f'{section_id}-page', 'options'),
+        Output(f'{section_id}-page', 'value'),
+        Output(f'{section_id}-wafers', 'options'),
+        Input('data-status', 'data'),
+        Input('filters', 'data'),
+        State(f'{section_id}-page', 'value')
+    )
+    def update_pickers(status, filters, page):
+        if not status or status['state'] != 'ready':
+            return no_update, no_update, no_update
+        wafer_ids = list(groups(data, filter_key(filters)))
+        pages = [{'label': f"Wafers {start + 1}-{min(start + wafers_per_page, len(wafer_ids))} of {len(wafer_ids)}",
+                  'value': start // wafers_per_page}
+                 for start in range(0, len(wafer_ids), wafers_per_page)]
+        if page is None or page >= len(pages):
+            page = 0
+        return pages, page, wafer_ids
+
+    @app.callback(
+        Output(section_id, 'children'),
+        Input('data-status', 'data'),
+        Input('filters', 'data'),
+        Input(f'{section_id}-page', 'value'),
+        Input(f'{section_id}-wafers', 'value')
+    )
+    def render_wafers(status, filters, page, picked):
+        if not status:
+            return no_update
+        if status['state'] != 'ready':
+            return html.Div("No data available")
+        changed = status.get('labels')
+        if ctx.triggered_id == 'data-status' and changed is not None and not set(labels) & set(changed):
+            return no_update
+        current, filters = data, filter_key(filters)
+        wafer_ids = list(groups(current, filters))
+        if not wafer_ids:
+            return html.Div(f"No data for {', '.join(labels)}")
+        if not picked:
+            start = (page or 0) * wafers_per_page
+            picked = wafer_ids[start:start + wafers_per_page]
+        return builder(current, picked, filters)
+
+for section_id, (builder, groups, labels) in WAFER_SECTIONS.items():
+    register_wafer_section(section_id, builder, groups, labels)
+
+def zoom_window(relayout):
+    """(x range, y range) of a relayoutData zoom, None for a reset, False otherwise.
+
+    An axis that wasn't zoomed (dragging along one axis only) has range None.
+    """
+    if not relayout:
+        return False
+    if relayout.get('xaxis.autorange') or relayout.get('yaxis.autorange'):
+        return None
+    window = tuple((relayout[f'{axis}.range[0]'], relayout[f'{axis}.range[1]'])
+                   if f'{axis}.range[0]' in relayout else None
+                   for axis in ('xaxis', 'yaxis'))
+    return window if any(window) else False
+
+@app.callback(
+    Output('scatter-graph', 'figure'),
+    Input('scatter-graph', 'relayoutData'),
+    State('filters', 'data'),
+    prevent_initial_call=True
+)
+def zoom_scatter(relayout, filters):
+    """Redraw the scatter from the full-resolution sites inside the zoomed view"""
+    window = zoom_window(relayout)
+    current = data
+    if window is False or current is None:
+        return no_update
+    return make_scatter_figure(current, filter_key(filters), window) or no_update
+
+@app.callback(
+    Output('summary-table', 'children'),
+    Input('data-status', 'data'),
+    Input('filters', 'data'),
+    Input('summary-group-by', 'value')
+)
+def render_summary(status, filters, group_by):
+    if not status:
+        return no_update
+    if status['state'] != 'ready':
+        return html.Div("No data available")
+    return make_statistical_summary_table(data, group_by or [], filter_key(filters))
+
+@app.callback(
+    Output('files-table-data', 'data'),
+    Output('files-table-data', 'page_count'),
+    Input('files-table-data', 'page_current'),
+    Input('files-table-data', 'page_size'),
+    Input('files-table-data', 'sort_by'),
+    Input('files-table-data', 'filter_query'),
+    State('filters', 'data')
+)
+def page_files_table(page, page_size, sort_by, filter_query, filters):
+    return table_page(files_table(data, filter_key(filters)), page, page_size, sort_by, filter_query)
+
+@app.callback(
+    Output('summary-table-data', 'data'),
+    Output('summary-table-data', 'page_count'),
+    Input('summary-table-data', 'page_current'),
+    Input('summary-table-data', 'page_size'),
+    Input('summary-table-data', 'sort_by'),
+    Input('summary-table-data', 'filter_query'),
+    State('filters', 'data'),
+    State('summary-group-by', 'value')
+)
+def page_summary_table(page, page_size, sort_by, filter_query, filters, group_by):
+    group_by = tuple(group_by or ()) or ('WaferID',)
+    table = summary_table(data, filter_key(filters), group_by)
+    return table_page(table, page, page_size, sort_by, filter_query)
+
+def metrics_rows(snapshot):
+    """One table row per span, slowest total first"""
+    rows = []
+    for name, span in sorted(snapshot['spans'].items(), key=lambda item: -item[1]['seconds']):
+        rates = ', '.join(f"{key[:-8]}/s {value:,.0f}" for key, value in span['counts'].items()
+                          if key.endswith('_per_sec') and value is not None)
+        rows.append({'span': name, 'calls': span['calls'], 'errors': span['errors'],
+                     'total_s': round(span['seconds'], 3), 'mean_ms': round(span['mean_seconds'] * 1000, 1),
+                     'max_ms': round(span['max_seconds'] * 1000, 1), 'rates': rates,
+                     'memory_high_mb': span['memory_high_mb'] and round(span['memory_high_mb'], 1)})
+    return rows
+
+if debug_panel:
+    @app.callback(Output('metrics-panel', 'children'), Input('metrics-poll', 'n_intervals'))
+    def update_debug_panel(_):
+        snapshot = metrics_snapshot()
+        memory, data = snapshot['memory'], snapshot['data']
+        mb = lambda value: 'n/a' if value is None else f'{value:,.0f} MB'
+        return html.Div([
+            html.P(f"Memory: {mb(memory['current_mb'])} now, {mb(memory['high_water_mb'])} high-water, "
+                   f"{mb(memory['process_peak_mb'])} process peak; "
+                   f"{data['files']} files, {data['sites']} sites (version {data['version']})"),
+            dash_table.DataTable(data=metrics_rows(snapshot),
+                                 columns=[{'name': name, 'id': name} for name in
+                                          ('span', 'calls', 'errors', 'total_s', 'mean_ms', 'max_ms', 'rates',
+                                           'memory_high_mb')],
+                                 style_cell={'textAlign': 'left', 'padding': '4px'})
+        ])
+
 if __name__ == '__main__':
-    app.run_server(debug=True)
\ No newline at end of file
+    app.run(debug=True, use_reloader=use_reloader)
\ No newline at end of file
@@ -0,0 +1,136 @@
+"""Benchmark the DMT pipeline on synthetic files.
+
+Usage::
+
+    python bench_dmt.py [--scales 10 1000 10000] [--data-dir DIR] [--workers N] [--engine scan] [--read-threads N] [--output bench-results.jsonl]
+
+For each scale (number of files) the synthetic files are generated once
+into DATA_DIR/<scale> and reused by later runs. Ingest, pairing, summary and
+figure construction are timed, with their throughput and the peak Python
+memory they allocate (tracemalloc in a separate run, main process only;
+with --workers > 1 the parsing itself happens in worker processes).
+Results are printed and appended as JSON lines to the output file, so
+runs can be compared.
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import time
+import tracemalloc
+from datetime import datetime
+
+from dmt_figures import boxplot_figure, downsample, radius_figure, scatter_figure
+from dmt_frames import label_columns
+from dmt_ingest import ingest_files
+from dmt_parser import DEFAULT_ENGINE, PARSER_ENGINES
+from dmt_summary import GOF_THRESHOLD, summarize
+from dmt_synth import generate_files
+
+
+def measure(func, *args, memory=True, **kwargs):
+    """Run func, returning (result, seconds, peak traced memory in MB).
+
+    Tracing allocations slows Python code down several times, so the timed
+    run is untraced and the peak memory comes from a second, traced run
+    (None when memory is False).
+    """
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    seconds = time.perf_counter() - start
+    if not memory:
+        return result, seconds, None
+    tracemalloc.start()
+    try:
+        func(*args, **kwargs)
+        peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    finally:
+        tracemalloc.stop()
+    return result, seconds, peak
+
+
+def dataset(data_dir, scale):
+    """Paths of the synthetic files for a scale, generating them on first use"""
+    scale_dir = os.path.join(data_dir, str(scale))
+    paths = sorted(glob.glob(os.path.join(scale_dir, '*.xml')))
+    if len(paths) != scale:
+        print(f"Generating {scale} synthetic files in {scale_dir}")
+        paths = generate_files(scale_dir, files=scale)
+    return paths
+
+
+def pair(df):
+    """Sites with both GoF and Thickness, sampled the way the large scatter is"""
+    paired = df[df['Goodness-of-Fit'].notna() & df['Layer 1 Thickness'].notna()]
+    downsample(paired, 50000, ['dmt', 'WaferID'], keep=paired['Goodness-of-Fit'] < GOF_THRESHOLD)
+    return paired
+
+
+def build_figures(df, files, paired):
+    """Build and serialize the overall boxplots, the scatter and one wafer's radius plot"""
+    figures = [boxplot_figure(df, files, label, label, sample_points=500)
+               for label in ('Layer 1 Thickness', 'Goodness-of-Fit')]
+    figures.append(scatter_figure(paired, files))
+    first_wafer = df['WaferID'].iloc[0]
+    figures.append(radius_figure(df[df['WaferID'] == first_wafer], files, first_wafer))
+    return sum(len(fig.to_json()) for fig in figures)
+
+
+def run_scale(paths, workers, memory=True, engine=DEFAULT_ENGINE, read_threads=0):
+    """Time every stage on one set of files; returns a list of result dicts"""
+    results = []
+
+    def record(stage, seconds, peak, **counts):
+        row = {'stage': stage, 'seconds': round(seconds, 4), 'peak_mb': peak and round(peak, 1)}
+        for name, count in counts.items():
+            row[name] = count
+            row[f'{name}_per_sec'] = round(count / seconds, 1) if seconds else None
+        results.append(row)
+
+    (df, files), seconds, peak = measure(ingest_files, paths, workers=workers, memory=memory, engine=engine,
+                                     read_threads=read_threads)
+    record('ingest', seconds, peak, files=len(files), records=int(df[label_columns(df)].notna().sum().sum()))
+
+    paired, seconds, peak = measure(pair, df, memory=memory)
+    record('pairing', seconds, peak, sites=len(paired))
+
+    summary, seconds, peak = measure(summarize, df, files, memory=memory)
+    record('summary', seconds, peak, sites=len(df))
+
+    # Plotly loads its validators on first use; keep that out of the timing
+    build_figures(df.iloc[:100], files, paired.iloc[:100])
+    size, seconds, peak = measure(build_figures, df, files, paired, memory=memory)
+    record('figures', seconds, peak, sites=len(df))
+    results[-1]['json_bytes'] = size
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the DMT pipeline on synthetic files')
+    parser.add_argument('--scales', type=int, nargs='+', default=[10, 1000, 10000], help='numbers of files')
+    parser.add_argument('--data-dir', default='bench_data', help='where synthetic files are kept')
+    parser.add_argument('--workers', type=int, default=1, help='ingest worker processes')
+    parser.add_argument('--engine', choices=list(PARSER_ENGINES), default=DEFAULT_ENGINE, help='XML parser engine')
+    parser.add_argument('--read-threads', type=int, default=0, help='threads reading files ahead of the parser')
+    parser.add_argument('--output', default='bench-results.jsonl', help='JSON lines file results are appended to')
+    parser.add_argument('--no-memory', action='store_true', help="skip the traced runs that measure peak memory")
+    args = parser.parse_args(argv)
+
+    run = {'run': datetime.now().isoformat(timespec='seconds'), 'python': platform.python_version(),
+           'machine': platform.machine(), 'workers': args.workers,
+           'engine': args.engine, 'read_threads': args.read_threads}
+    with open(args.output, 'a') as out:
+        for scale in args.scales:
+            paths = dataset(args.data_dir, scale)
+            for row in run_scale(paths, args.workers, memory=not args.no_memory, engine=args.engine,
+                                 read_threads=args.read_threads):
+                row = {**run, 'scale': scale, **row}
+                out.write(json.dumps(row) + '\n')
+                rates = ', '.join(f'{key[:-8]}/s={value}' for key, value in row.items() if key.endswith('_per_sec'))
+                peak = '' if row['peak_mb'] is None else f"peak {row['peak_mb']:>8.1f} MB  "
+                print(f"{scale:>6} files  {row['stage']:<8} {row['seconds']:>9.3f} s  {peak}{rates}")
+
+
+if __name__ == '__main__':
+    main()
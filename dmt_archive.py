@@ -0,0 +1,92 @@
+"""Read DMT files from gzip files and zip archives without extracting them.
+
+A zip member is addressed as the archive's path, a slash and the member
+name (``Y:\\Xfile\\DMT102\\2024-Q1.zip/2024-01-02T...-DMT102-....xml``), so
+its base name is the member's own file name and the filename metadata is
+parsed from it like from any other file. ``.xml.gz`` files are read as
+their decompressed XML.
+"""
+import functools
+import gzip
+import os
+import re
+import zipfile
+from contextlib import contextmanager
+
+# Splits a zip member path into the archive path and the member name
+_MEMBER_RE = re.compile(r'^(?P<archive>.+?\.zip)/(?P<member>.+)$', re.IGNORECASE)
+
+
+def is_gzip(path):
+    return path.lower().endswith('.gz')
+
+
+def split_member(path):
+    """(archive path, member name) of a zip member path, (path, None) otherwise"""
+    match = _MEMBER_RE.match(path)
+    if match is None:
+        return path, None
+    return match['archive'], match['member']
+
+
+def member_path(archive, member):
+    return f'{archive}/{member}'
+
+
+def list_members(archive):
+    """Names of the XML files (plain or gzipped) in a zip archive; only its directory is read"""
+    with zipfile.ZipFile(archive) as zf:
+        return [info.filename for info in zf.infolist()
+                if not info.is_dir() and info.filename.lower().endswith(('.xml', '.xml.gz'))]
+
+
+@functools.lru_cache(maxsize=8)
+def _open_archive(archive, mtime_ns, pid):
+    # Kept open so reading many members doesn't re-read the archive's directory
+    # each time; zipfile serializes reads of one archive from several threads.
+    # Keyed by process: a forked worker must not share its parent's file offset.
+    return zipfile.ZipFile(archive)
+
+
+def _archive(archive):
+    return _open_archive(archive, os.stat(archive).st_mtime_ns, os.getpid())
+
+
+@contextmanager
+def open_source(path):
+    """Binary file object of a DMT file's XML, decompressing gzip and zip members as it is read"""
+    archive, member = split_member(path)
+    if member is not None:
+        with _archive(archive).open(member) as f:
+            if is_gzip(member):
+                with gzip.open(f) as g:
+                    yield g
+            else:
+                yield f
+    elif is_gzip(path):
+        with gzip.open(path) as f:
+            yield f
+    else:
+        with open(path, 'rb') as f:
+            yield f
+
+
+def read_source(path):
+    """The XML bytes of a DMT file, see open_source"""
+    with open_source(path) as f:
+        return f.read()
+
+
+def stat_source(path, archive_stats=None):
+    """(mtime_ns, size) identifying the version of a file; a member's is its archive's.
+
+    Pass the same ``archive_stats`` dict for a batch of paths to stat each
+    archive only once.
+    """
+    archive, member = split_member(path)
+    if member is not None and archive_stats is not None and archive in archive_stats:
+        return archive_stats[archive]
+    st = os.stat(archive)
+    if member is not None and archive_stats is not None:
+        archive_stats[archive] = (st.st_mtime_ns, st.st_size)
+    return st.st_mtime_ns, st.st_size
@@ -0,0 +1,253 @@
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+from dmt_archive import stat_source
+from dmt_derived import DERIVED_COLUMNS
+from dmt_frames import FILE_CATEGORIES, FILE_COLUMNS, build_frames, concat_frames
+
+# Bump when the layout of the cached tables changes; older caches are ignored
+CACHE_VERSION = 7
+
+# sites is the number of rows a file has and part the part file holding them
+MANIFEST_COLUMNS = ['mtime_ns', 'size'] + [column for column in FILE_COLUMNS if column != 'full_path'] + ['sites', 'part']
+
+# A save merges the parts of a partition smaller than this (in site rows)
+# into the part it writes, so frequent small saves don't pile up tiny files
+PART_SITES = 1_000_000
+
+
+class ParseCache:
+    """On-disk Parquet cache of parsed rows, keyed by file path, mtime and size.
+
+    DMT files never change once the tool has written them, so a file whose
+    mtime and size match the cached entry is loaded from the cache instead of
+    being parsed again. The cache holds a manifest with one row per cached
+    file, and the parsed site rows in part files (one per save, tagged with
+    the ``full_path`` of the file they came from instead of a file key).
+    Only the manifest is kept in memory; the manifest entry of a file names
+    the part holding its rows, and rows of that file in any other part (from
+    before it was cached again) are ignored.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.files_path = os.path.join(cache_dir, f'files-v{CACHE_VERSION}.parquet')
+        self.records_dir = os.path.join(cache_dir, f'records-v{CACHE_VERSION}')
+        self._files = None
+        self._columns = {}  # part file -> its column names
+
+    @staticmethod
+    def available():
+        return pq is not None
+
+    def _load(self):
+        if self._files is not None:
+            return
+        try:
+            self._files = pd.read_parquet(self.files_path).set_index('full_path')
+        except FileNotFoundError:
+            self._files = None
+        except Exception as e:
+            print(f"Ignoring unreadable cache manifest {self.files_path}: {e}")
+            self._files = None
+        if self._files is None:
+            self._files = pd.DataFrame(columns=MANIFEST_COLUMNS, index=pd.Index([], name='full_path'))
+
+    def split(self, files):
+        """Split files into cache hits and files that need parsing.
+
+        Returns ``(hits, misses, stats)`` where ``stats`` maps every path that
+        could be stat'ed to its ``(mtime_ns, size)`` for a later ``save``
+        (a zip member's are its archive's, see dmt_archive.stat_source).
+        """
+        self._load()
+        known = dict(zip(self._files.index, zip(self._files['mtime_ns'], self._files['size'])))
+        hits, misses, stats = [], [], {}
+        archive_stats = {}
+        for path in files:
+            try:
+                stats[path] = stat_source(path, archive_stats)
+            except OSError:
+                misses.append(path)
+                continue
+            if known.get(path) == stats[path]:
+                hits.append(path)
+            else:
+                misses.append(path)
+        return hits, misses, stats
+
+    def _entries(self, paths):
+        """Files table of the cached files among paths, in their order"""
+        self._load()
+        entries = self._files.loc[list(paths)]
+        return entries.reset_index().astype({name: 'category' for name in FILE_CATEGORIES})[FILE_COLUMNS]
+
+    def get(self, paths):
+        """Return the cached ``(df, files)`` pair for paths, or None if there is none"""
+        files = self._entries(paths)
+        if not len(files):
+            return None
+        return self._read(files, np.ones(len(files), dtype=bool)), files
+
+    def evict(self, df, files, newest=None):
+        """Rows of df to keep in memory; all of them, see SiteStore for a cache that lets go of some"""
+        return df
+
+    def _partitions(self, files):
+        """Partition directory of each file of a files table (the cache has just one)"""
+        return np.full(len(files), '', dtype=object)
+
+    def save(self, df, files, stats):
+        """Add or replace the entries for the files of a ``(df, files)`` pair and write the cache.
+
+        Only files with an entry in ``stats`` (see ``split``) are cached.
+        Entries for other files are kept, so narrowing the file patterns does
+        not throw away history. The rows go to one new part file per
+        partition, together with the rows of that partition's small parts.
+        """
+        self._load()
+        files = files[files['full_path'].isin(stats)]
+        if not len(files):
+            return
+
+        entries = files.set_index('full_path')[MANIFEST_COLUMNS[2:-2]].astype({name: object for name in FILE_CATEGORIES})
+        entries.insert(0, 'mtime_ns', [stats[path][0] for path in entries.index])
+        entries.insert(1, 'size', [stats[path][1] for path in entries.index])
+        key_sites = np.bincount(df['file_key'].to_numpy(), minlength=int(files.index.max()) + 1)
+        entries['sites'] = key_sites[files.index.to_numpy()]
+        entries['part'] = None
+
+        # Rows tagged with their file's path, sorted by the partition of the file
+        rows = df[df['file_key'].isin(files.index)]
+        rows = rows.drop(columns=[name for name in DERIVED_COLUMNS if name in rows.columns])
+        partition_of = pd.Series(self._partitions(files), index=files.index)
+        partition_codes, partitions = pd.factorize(partition_of.reindex(rows['file_key']).to_numpy())
+        order = np.argsort(partition_codes, kind='stable')
+        bounds = np.searchsorted(partition_codes[order], np.arange(len(partitions) + 1))
+
+        old = self._files[~self._files.index.isin(entries.index)]
+        old_parts = set(self._files['part'].dropna())
+        part_sites = old.groupby('part')['sites'].sum()
+        moved = {}  # path of a file kept from a merged part -> its new part
+        os.makedirs(self.cache_dir, exist_ok=True)
+        for i, partition in enumerate(partitions):
+            part_rows = rows.iloc[order[bounds[i]:bounds[i + 1]]]
+            path_codes, part_keys = pd.factorize(part_rows['file_key'].to_numpy())
+            records = [part_rows.drop(columns='file_key').assign(
+                full_path=pd.Categorical.from_codes(path_codes, categories=files.loc[part_keys, 'full_path'].to_numpy())
+            )]
+            part = f'{partition}/part-{uuid.uuid4().hex}.parquet' if partition else f'part-{uuid.uuid4().hex}.parquet'
+            small = [p for p, sites in part_sites.items() if _partition(p) == partition and sites < PART_SITES]
+            for merged in small:
+                kept = old.index[old['part'] == merged]
+                rows_kept = self._read_part(merged, pd.Series(np.arange(len(kept)), index=kept))
+                if rows_kept is None:
+                    continue
+                rows_kept = rows_kept.drop(columns='file_key').assign(
+                    full_path=pd.Categorical.from_codes(rows_kept['file_key'].to_numpy(), categories=kept.to_numpy()))
+                records.append(rows_kept)
+                moved.update(dict.fromkeys(kept, part))
+            records = concat_frames(records)
+            records['full_path'] = records['full_path'].cat.remove_unused_categories()
+            path = os.path.join(self.records_dir, part)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            records.to_parquet(path, index=False)
+            entries.loc[partition_of.index[partition_of == partition].map(files['full_path']), 'part'] = part
+
+        old = old.assign(part=[moved.get(path, part) for path, part in zip(old.index, old['part'])])
+        all_files = pd.concat([old, entries]) if len(old) else entries
+        # The part files go first: a manifest entry without rows would be a wrong cache hit.
+        # Write next to the real manifest and swap it in, so a crash can't leave a torn one.
+        tmp_path = self.files_path + '.tmp'
+        all_files.reset_index().to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, self.files_path)
+        self._files = all_files
+
+        # Parts none of whose files point at them any more
+        for part in old_parts - set(all_files['part']):
+            path = os.path.join(self.records_dir, part)
+            self._columns.pop(path, None)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _read_part(self, part, key_of, columns=None, where=None):
+        """Rows of one part file of the files in key_of (path -> file key) whose rows it holds, or None.
+
+        ``where`` is a list of (column, values) pairs; only rows whose column
+        holds one of the values are read (a part without the column has none).
+        """
+        path = os.path.join(self.records_dir, part)
+        try:
+            if columns is None and not where:
+                rows = pd.read_parquet(path)
+            else:
+                if path not in self._columns:
+                    self._columns[path] = pq.read_schema(path).names
+                names = self._columns[path]
+                if any(name not in names for name, _ in where or ()):
+                    return None
+                if columns is not None:
+                    columns = [name for name in names if name in columns]
+                filters = [(name, 'in', list(values)) for name, values in where] if where else None
+                rows = pd.read_parquet(path, columns=columns, filters=filters)
+        except Exception as e:
+            print(f"Error reading cache part {path}: {e}")
+            return None
+        paths_cat = rows['full_path'].array
+        category_keys = key_of.reindex(paths_cat.categories).fillna(-1).to_numpy(np.int32)
+        row_keys = category_keys[paths_cat.codes]
+        rows = rows.drop(columns='full_path')
+        rows.insert(0, 'file_key', row_keys)
+        return rows[row_keys >= 0]
+
+    def _read(self, files, wanted, columns=None, counts=None, where=None):
+        """Rows of the files of a files table selected by the mask ``wanted``, keyed by their position in it.
+
+        Only the part files holding those files' rows are opened, with
+        ``columns`` (a set, which must include full_path) only those columns
+        are read from them, and with ``where`` only the matching rows (see
+        _read_part).
+        """
+        self._load()
+        keys = np.flatnonzero(wanted)
+        paths = files['full_path'].to_numpy(object)[keys]
+        parts = self._files['part'].reindex(paths).to_numpy(object)
+
+        frames = []
+        for part in pd.unique(parts[pd.notna(parts)]):
+            in_part = parts == part
+            rows = self._read_part(part, pd.Series(keys[in_part], index=paths[in_part]), columns, where)
+            if rows is not None:
+                frames.append(rows)
+        if counts is not None:
+            counts.update(parts=len(frames), sites=sum(len(frame) for frame in frames))
+        if not frames:
+            empty = build_frames([])[0]
+            return empty if columns is None else empty[[name for name in empty.columns if name in columns | {'file_key'}]]
+
+        # Back in files table order, as if the files had just been parsed, with
+        # the categories in order of appearance like build_frames gives them
+        rows = concat_frames(frames)
+        order = np.argsort(rows['file_key'].to_numpy(), kind='stable')
+        rows = rows.take(order).reset_index(drop=True)
+        for name in rows.columns:
+            if isinstance(rows[name].dtype, pd.CategoricalDtype):
+                values = rows[name].array.remove_unused_categories()
+                seen = pd.unique(values.codes[values.codes >= 0])
+                rows[name] = values.reorder_categories(values.categories[seen])
+        return rows
+
+
+def _partition(part):
+    """Partition directory of a part file ('' for one at the top)"""
+    return part.rpartition('/')[0]
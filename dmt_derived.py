@@ -0,0 +1,71 @@
+import numpy as np
+
+# Coordinates are rounded to this many mm when building site keys, so the
+# same site gets the same key across labels, files and wafers
+SITE_RESOLUTION_MM = 0.001
+
+# Offset keeping the rounded coordinates (|x|, |y| <= 150 mm) non-negative
+_SITE_OFFSET = 500_000
+
+# name -> function(df) returning the column; run in registration order, so a
+# function may use columns registered before it
+DERIVED_COLUMNS = {}
+
+
+def derived_column(name):
+    """Register a function computing a derived column from the measurement frame.
+
+    The function gets the whole frame and must return an array (or Series)
+    with one value per row, computed on whole columns rather than per row.
+    For example an edge-exclusion flag::
+
+        @derived_column('edge')
+        def edge(df):
+            return df['RADIUS'].to_numpy() > 147.0
+    """
+    def register(func):
+        DERIVED_COLUMNS[name] = func
+        return func
+    return register
+
+
+def _coordinates(df):
+    return df['XWaferLoc'].to_numpy(np.float64), df['YWaferLoc'].to_numpy(np.float64)
+
+
+@derived_column('RADIUS')
+def radius(df):
+    """Distance of the site from the wafer center in mm"""
+    x, y = _coordinates(df)
+    return np.hypot(x, y)
+
+
+@derived_column('ANGLE')
+def angle(df):
+    """Polar angle of the site in degrees, counter-clockwise from +X in [0, 360)"""
+    x, y = _coordinates(df)
+    return np.mod(np.degrees(np.arctan2(y, x)), 360.0)
+
+
+@derived_column('site_key')
+def site_key(df):
+    """Integer key of the site position, -1 where a coordinate is missing"""
+    x, y = _coordinates(df)
+    valid = ~(np.isnan(x) | np.isnan(y))
+    xi = np.rint(np.where(valid, x, 0.0) / SITE_RESOLUTION_MM).astype(np.int64) + _SITE_OFFSET
+    yi = np.rint(np.where(valid, y, 0.0) / SITE_RESOLUTION_MM).astype(np.int64) + _SITE_OFFSET
+    return np.where(valid, xi * (2 * _SITE_OFFSET) + yi, -1)
+
+
+def site_coordinates(keys):
+    """x, y (mm) of site keys, at SITE_RESOLUTION_MM (the inverse of site_key)"""
+    xi, yi = np.divmod(np.asarray(keys, dtype=np.int64), 2 * _SITE_OFFSET)
+    return (xi - _SITE_OFFSET) * SITE_RESOLUTION_MM, (yi - _SITE_OFFSET) * SITE_RESOLUTION_MM
+
+
+def add_derived_columns(df, names=None):
+    """Add the registered derived columns (or just ``names``) to df in place and return it"""
+    for name, func in DERIVED_COLUMNS.items():
+        if names is None or name in names:
+            df[name] = func(df)
+    return df
@@ -0,0 +1,369 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from dmt_profile import PROFILE_RADII
+from dmt_summary import GOF_THRESHOLD
+from dmt_wafermap import WAFER_RADIUS_MM, map_axis
+
+# Whiskers reach the furthest point within this many IQRs of the box (Tukey)
+WHISKER_IQR = 1.5
+
+
+def box_stats(values, x, color):
+    """Box statistics of values per (x, color) group, computed server-side.
+
+    Quartiles use linear interpolation like plotly's default. Whiskers end
+    at the furthest value within WHISKER_IQR * IQR of the box, and values
+    beyond them are returned as outliers. Everything is done with grouped,
+    vectorized operations over the whole column.
+
+    Returns ``(stats, outliers, inliers)``: one row per group with x, color,
+    q1, median, q3, mean, count, lowerfence and upperfence, plus the outlier
+    and inlier rows as x, color, value frames.
+    """
+    data = pd.DataFrame({'x': np.asarray(x), 'color': np.asarray(color), 'value': np.asarray(values, dtype=np.float64)})
+    data = data[data['value'].notna()]
+    grouped = data.groupby(['x', 'color'], observed=True, sort=True)['value']
+
+    quartiles = grouped.quantile([0.25, 0.5, 0.75]).unstack(-1)
+    stats = pd.DataFrame({
+        'q1': quartiles[0.25],
+        'median': quartiles[0.5],
+        'q3': quartiles[0.75],
+        'mean': grouped.mean(),
+        'count': grouped.size(),
+    })
+
+    # Map the per-group fence limits back onto the rows through the group number
+    group = grouped.ngroup().to_numpy()
+    iqr = (stats['q3'] - stats['q1']).to_numpy()
+    low = stats['q1'].to_numpy() - WHISKER_IQR * iqr
+    high = stats['q3'].to_numpy() + WHISKER_IQR * iqr
+    value = data['value'].to_numpy()
+    inlier = (value >= low[group]) & (value <= high[group])
+
+    fences = data[inlier].groupby(group[inlier])['value'].agg(['min', 'max'])
+    stats['lowerfence'] = fences['min'].to_numpy()
+    stats['upperfence'] = fences['max'].to_numpy()
+    return stats.reset_index(), data[~inlier], data[inlier]
+
+
+def box_summary_figure(values, x, color, sample_points=0, title=None, x_title=None, y_title=None, color_title=None):
+    """Box plot figure built from server-side box statistics.
+
+    Only the per-group statistics, the outliers and at most
+    ``sample_points`` randomly sampled inlier points are put in the figure,
+    so its size depends on the number of (x, color) groups rather than on
+    the number of measurements.
+    """
+    stats, outliers, inliers = box_stats(values, x, color)
+    if sample_points and len(inliers) > sample_points:
+        inliers = inliers.sample(n=sample_points, random_state=0)
+    points = pd.concat([outliers, inliers])
+
+    fig = go.Figure()
+    colors = px.colors.qualitative.Plotly
+    for i, (color_value, group_stats) in enumerate(stats.groupby('color', observed=True, sort=False)):
+        group_color = colors[i % len(colors)]
+        fig.add_trace(go.Box(
+            x=group_stats['x'],
+            q1=group_stats['q1'],
+            median=group_stats['median'],
+            q3=group_stats['q3'],
+            mean=group_stats['mean'],
+            lowerfence=group_stats['lowerfence'],
+            upperfence=group_stats['upperfence'],
+            name=str(color_value),
+            legendgroup=str(color_value),
+            legendgrouptitle_text=color_title if i == 0 else None,
+            marker_color=group_color,
+            boxpoints=False
+        ))
+        group_points = points[points['color'] == color_value]
+        if not group_points.empty:
+            fig.add_trace(go.Scatter(
+                x=group_points['x'],
+                y=group_points['value'],
+                mode='markers',
+                name=str(color_value),
+                legendgroup=str(color_value),
+                showlegend=False,
+                marker=dict(color=group_color, size=4)
+            ))
+
+    # Each file comes from one tool, so boxes share an x slot instead of being offset
+    fig.update_layout(
+        title=title,
+        xaxis_title=x_title,
+        yaxis_title=y_title,
+        boxmode='overlay',
+        xaxis=dict(type='category', categoryorder='category ascending')
+    )
+    return fig
+
+
+def downsample(rows, max_points, strata, keep=None, seed=0):
+    """At most max_points of rows, sampled evenly within each stratum.
+
+    Every stratum (e.g. DMT and wafer) keeps its share of the sample in
+    proportion to its size, so small wafers don't disappear. Rows where
+    ``keep`` is true (e.g. low GoF sites) are always taken first, up to
+    max_points of them.
+    """
+    if len(rows) <= max_points:
+        return rows
+    rng = np.random.default_rng(seed)
+    keep = np.zeros(len(rows), dtype=bool) if keep is None else np.asarray(keep, dtype=bool)
+    kept = np.flatnonzero(keep)
+    if len(kept) >= max_points:
+        return rows.iloc[np.sort(rng.choice(kept, max_points, replace=False))]
+
+    # Rank the other rows in random order within their stratum and take the
+    # first ones of each, up to the stratum's share of what is left: its
+    # share rounded down, plus one for strata picked at random (weighted by
+    # the fraction they lost) until the points left over are used up
+    rest = rows[~keep]
+    order = rng.permutation(len(rest))
+    shuffled = rest.iloc[order]
+    grouped = shuffled.groupby(strata, observed=True, sort=False)
+    budget = max_points - len(kept)
+    group = grouped.ngroup().to_numpy()
+    quota, remainder = np.divmod(np.bincount(group) * budget, len(rest))
+    leftover = budget - int(quota.sum())
+    if leftover:
+        quota[rng.choice(len(quota), leftover, replace=False, p=remainder / remainder.sum())] += 1
+    taken = order[grouped.cumcount().to_numpy() < quota[group]]
+    positions = np.concatenate([kept, np.flatnonzero(~keep)[taken]])
+    return rows.iloc[np.sort(positions)]
+
+
+def density_heatmap(x, y, bins=100, name='Sites'):
+    """Heatmap trace of point counts binned on the server, so only the bin counts are sent"""
+    counts, x_edges, y_edges = np.histogram2d(np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64), bins=bins)
+    z = np.where(counts > 0, counts, np.nan).T
+    return go.Heatmap(
+        x=(x_edges[:-1] + x_edges[1:]) / 2,
+        y=(y_edges[:-1] + y_edges[1:]) / 2,
+        z=z,
+        name=name,
+        colorscale='Viridis',
+        colorbar=dict(title='Sites'),
+        hovertemplate='x: %{x}<br>y: %{y}<br>Sites: %{z}<extra></extra>'
+    )
+
+
+def file_times(rows, files):
+    """File date/time of each row as text, looked up once per file through file_key"""
+    times = files['datetime'].dt.strftime('%Y-%m-%d %H:%M:%S').to_numpy()
+    return pd.Series(times[rows['file_key'].to_numpy()], index=rows.index, name='datetime')
+
+
+def boxplot_figure(rows, files, label, title, mode='summary', sample_points=0):
+    """Boxplot of label over file time, colored by DMT.
+
+    mode 'summary' uses box_summary_figure; 'points' hands every point to
+    px.box and lets the browser compute the boxes.
+    """
+    if mode == 'summary':
+        return box_summary_figure(rows[label], file_times(rows, files), rows['dmt'],
+                                  sample_points=sample_points, title=title,
+                                  x_title='File DateTime', y_title=label, color_title='DMT Type')
+    fig = px.box(
+        rows,
+        x=file_times(rows, files),
+        y=label,
+        color='dmt',
+        points='all',
+        title=title,
+        labels={'datetime': 'File DateTime', 'dmt': 'DMT Type'}
+    )
+    fig.update_layout(xaxis_title='File DateTime', yaxis_title=label)
+    return fig
+
+
+def webgl_scatter(paired, files, gof_threshold=GOF_THRESHOLD, max_points=50000):
+    """WebGL GoF vs thickness scatter with one trace per DMT type, sampled down to max_points"""
+    low_gof = paired['Goodness-of-Fit'] < gof_threshold
+    shown = downsample(paired, max_points, ['dmt', 'WaferID'], keep=low_gof)
+    fig = go.Figure()
+    for dmt_type, dmt_data in shown.groupby('dmt', observed=True):
+        fig.add_trace(go.Scattergl(
+            x=dmt_data['Goodness-of-Fit'],
+            y=dmt_data['Layer 1 Thickness'],
+            mode='markers',
+            name=f'{dmt_type}',
+            marker=dict(size=4),
+            customdata=np.column_stack([dmt_data['WaferID'].astype(str), file_times(dmt_data, files)]),
+            hovertemplate='<b>%{fullData.name}</b><br>' +
+                          'Goodness-of-Fit: %{x:.4f}<br>' +
+                          'Thickness: %{y:.2f}<br>' +
+                          'WaferID: %{customdata[0]}<br>' +
+                          'DateTime: %{customdata[1]}<br>' +
+                          '<extra></extra>'
+        ))
+    return fig, len(shown)
+
+
+def density_scatter(paired, gof_threshold=GOF_THRESHOLD, max_points=50000):
+    """Density heatmap of all paired sites, with the low GoF sites drawn on top"""
+    fig = go.Figure(density_heatmap(paired['Goodness-of-Fit'], paired['Layer 1 Thickness']))
+    low_gof = paired[paired['Goodness-of-Fit'] < gof_threshold]
+    low_gof = downsample(low_gof, max_points, ['dmt', 'WaferID'])
+    fig.add_trace(go.Scattergl(
+        x=low_gof['Goodness-of-Fit'],
+        y=low_gof['Layer 1 Thickness'],
+        mode='markers',
+        name=f'GoF < {gof_threshold}',
+        marker=dict(size=4, color='red')
+    ))
+    return fig, len(low_gof)
+
+
+def scatter_figure(paired, files, gof_threshold=GOF_THRESHOLD, webgl_points=5000, max_points=50000,
+                   density_points=500000):
+    """Layer 1 Thickness vs Goodness-of-Fit of paired sites.
+
+    Up to webgl_points sites are drawn with one marker symbol per wafer;
+    above that the scatter is WebGL and sampled (webgl_scatter), and above
+    density_points it becomes a density heatmap (density_scatter).
+    """
+    title = 'Layer 1 Thickness vs Goodness-of-Fit (Same Measurement Points)'
+    
+    if len(paired) > density_points:
+        fig, shown = density_scatter(paired, gof_threshold, max_points)
+        title += f' - density of {len(paired)} sites, zoom in for points'
+    elif len(paired) > webgl_points:
+        fig, shown = webgl_scatter(paired, files, gof_threshold, max_points)
+        if shown < len(paired):
+            title += f' - {shown} of {len(paired)} sites, zoom in for all'
+    else:
+        merged_data = pd.DataFrame({
+            'file_key': paired['file_key'],
+            'WaferID': paired['WaferID'],
+            'dmt': paired['dmt'],
+            'GoodnessOfFit': paired['Goodness-of-Fit'],
+            'Layer1Thickness': paired['Layer 1 Thickness']
+        })
+        merged_data['datetime'] = file_times(merged_data, files)
+        
+        fig = px.scatter(
+            merged_data,
+            x='GoodnessOfFit',
+            y='Layer1Thickness',
+            color='dmt',
+            symbol='WaferID',
+            labels={
+                'GoodnessOfFit': 'Goodness-of-Fit',
+                'Layer1Thickness': 'Layer 1 Thickness',
+                'dmt': 'DMT Type'
+            },
+            hover_data=['WaferID', 'datetime']
+        )
+    
+    fig.update_layout(
+        title=title,
+        xaxis_title='Goodness-of-Fit',
+        yaxis_title='Layer 1 Thickness',
+        height=600,
+        margin=dict(l=50, r=50, t=50, b=50)
+    )
+    return fig
+
+
+def radius_figure(wafer_data, files, wafer_id, profiles=None):
+    """Layer 1 Thickness vs RADIUS of one wafer's sites, one trace per DMT type.
+
+    ``profiles`` is the wafer's (table, curves) from a dmt_profile.ProfileCache;
+    each fitted profile is drawn as a line over the points.
+    """
+    fig = go.Figure()
+    
+    # Add scatter points colored by DMT type
+    for dmt_type in wafer_data['dmt'].unique():
+        dmt_data = wafer_data[wafer_data['dmt'] == dmt_type]
+        fig.add_trace(go.Scatter(
+            x=dmt_data['RADIUS'],
+            y=dmt_data['Layer 1 Thickness'],
+            mode='markers',
+            name=f'{dmt_type}',
+            marker=dict(size=8),
+            text=file_times(dmt_data, files),
+            hovertemplate='<b>%{fullData.name}</b><br>' +
+                          'RADIUS: %{x:.2f}<br>' +
+                          'Thickness: %{y:.2f}<br>' +
+                          'DateTime: %{text}<br>' +
+                          '<extra></extra>'
+        ))
+    
+    if profiles is not None:
+        table, curves = profiles
+        times = file_times(table, files)
+        for profile, curve, when in zip(table.itertuples(index=False), curves, times):
+            fitted = ~np.isnan(curve)
+            fig.add_trace(go.Scatter(
+                x=PROFILE_RADII[fitted],
+                y=curve[fitted],
+                mode='lines',
+                name=f'{profile.dmt} profile',
+                line=dict(width=2),
+                hovertemplate='<b>%{fullData.name}</b><br>' +
+                              'RADIUS: %{x:.1f}<br>' +
+                              'Fit: %{y:.2f}<br>' +
+                              f'Center to edge: {profile.center_to_edge:.2f}<br>' +
+                              f'Edge roll-off: {profile.edge_rolloff:.2f}<br>' +
+                              f'DateTime: {when}<br>' +
+                              '<extra></extra>'
+            ))
+    
+    # Update layout
+    fig.update_layout(
+        title=f'Layer 1 Thickness vs RADIUS - WaferID: {wafer_id}',
+        xaxis_title='RADIUS',
+        yaxis_title='Layer 1 Thickness',
+        xaxis=dict(range=[0, 150]),
+        height=500,
+        margin=dict(l=50, r=50, t=50, b=50),
+        showlegend=True
+    )
+    return fig
+
+
+def wafer_map_figure(wafer_map, label, title, sites=None, style='heatmap'):
+    """A wafer map (from dmt_wafermap) as a heatmap or contour plot.
+
+    ``sites`` optionally has the measured sites (XWaferLoc, YWaferLoc and
+    label), which are marked on the map.
+    """
+    axis = map_axis(wafer_map.shape[0])
+    trace = go.Contour if style == 'contour' else go.Heatmap
+    fig = go.Figure(trace(
+        x=axis,
+        y=axis,
+        z=wafer_map,
+        colorscale='Viridis',
+        colorbar=dict(title=label),
+        hovertemplate='X: %{x:.0f}<br>Y: %{y:.0f}<br>' + f'{label}: ' + '%{z:.4g}<extra></extra>'
+    ))
+    if sites is not None:
+        fig.add_trace(go.Scatter(
+            x=sites['XWaferLoc'],
+            y=sites['YWaferLoc'],
+            mode='markers',
+            marker=dict(size=4, color='black'),
+            customdata=sites[label],
+            hovertemplate='X: %{x:.2f}<br>Y: %{y:.2f}<br>' + f'{label}: ' + '%{customdata:.4g}<extra>site</extra>',
+            showlegend=False
+        ))
+    
+    fig.add_shape(type='circle', x0=-WAFER_RADIUS_MM, y0=-WAFER_RADIUS_MM, x1=WAFER_RADIUS_MM, y1=WAFER_RADIUS_MM,
+                  line=dict(color='gray'))
+    fig.update_layout(
+        title=title,
+        xaxis=dict(title='X (mm)', range=[-WAFER_RADIUS_MM, WAFER_RADIUS_MM], constrain='domain'),
+        yaxis=dict(title='Y (mm)', range=[-WAFER_RADIUS_MM, WAFER_RADIUS_MM], scaleanchor='x'),
+        height=450,
+        margin=dict(l=50, r=50, t=50, b=50)
+    )
+    return fig
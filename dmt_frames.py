@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from dmt_derived import DERIVED_COLUMNS
+
+# Fixed columns of the site table, one row per (file, wafer, site);
+# file_key is the row of the files table the site came from. Each DataRecord
+# label gets its own column after these, and derived columns (see
+# dmt_derived) come on top.
+SITE_COLUMNS = ['file_key', 'dmt', 'WaferID', 'Slot', 'site', 'XWaferLoc', 'YWaferLoc']
+
+# Labels that only repeat the site coordinates
+COORDINATE_LABELS = ('XPos', 'YPos')
+
+# Run metadata from each file's Context block, kept as categorical columns
+# of the files table
+CONTEXT_COLUMNS = ['LotID', 'RecipeName', 'RunId', 'SessionID', 'Operation']
+
+# Columns of the files table, indexed by file_key; datetime is the ProcTime
+FILE_COLUMNS = ['filename', 'full_path', 'dmt', 'LotID', 'datetime', 'RecipeName', 'RunId', 'SessionID', 'Operation']
+
+# Categorical columns of the files table
+FILE_CATEGORIES = ['dmt'] + CONTEXT_COLUMNS
+
+
+def label_columns(df):
+    """Names of the per-label value columns of a site table"""
+    return [column for column in df.columns if column not in SITE_COLUMNS and column not in DERIVED_COLUMNS]
+
+
+def measurement_columns(df):
+    """Label columns holding measurements rather than coordinates"""
+    return [column for column in label_columns(df) if column not in COORDINATE_LABELS]
+
+
+def file_column(df, files, name):
+    """Per-row values of a files-table column, looked up through file_key"""
+    return pd.Series(files[name].to_numpy()[df['file_key'].to_numpy()], index=df.index, name=name)
+
+
+def _category_map(values, categories):
+    """Map per-file category values onto the shared categories, -1 for missing"""
+    codes = [-1 if value is None else categories.setdefault(value, len(categories)) for value in values]
+    # One extra slot so a per-file code of -1 maps to -1 as well
+    return np.array(codes + [-1], dtype=np.int32)
+
+
+def build_frames(results):
+    """Build the site table and files table from parse_file results.
+
+    Every column is filled into a preallocated, typed buffer straight from
+    the per-file arrays, so no per-row Python objects are created: dmt and
+    WaferID become categoricals, coordinates are float32, each label is a
+    float64 column (NaN where a site has no value), and each row carries an
+    integer file key instead of its own timestamp. The per-file Context
+    values become categorical columns of the files table.
+    """
+    n = sum(len(result['site']) for result in results)
+    file_key = np.empty(n, dtype=np.int32)
+    wafer = np.empty(n, dtype=np.int32)
+    site = np.empty(n, dtype=np.int16)
+    slot = np.empty(n, dtype=np.int16)
+    x = np.empty(n, dtype=np.float32)
+    y = np.empty(n, dtype=np.float32)
+    values = {}  # label -> column, created on first use
+
+    wafers, dmts = {}, {}
+    file_dmt = np.empty(len(results), dtype=np.int32)
+    pos = 0
+    for key, result in enumerate(results):
+        end = pos + len(result['site'])
+        file_key[pos:end] = key
+        wafer[pos:end] = _category_map(result['wafers'], wafers)[result['wafer_codes']]
+        site[pos:end] = result['site']
+        slot[pos:end] = result['slot']
+        x[pos:end] = result['x']
+        y[pos:end] = result['y']
+        for label, (rows, data) in result['values'].items():
+            if label not in values:
+                values[label] = np.full(n, np.nan)
+            values[label][pos + rows] = data
+        file_dmt[key] = dmts.setdefault(result['dmt'], len(dmts))
+        pos = end
+
+    df = pd.DataFrame({
+        'file_key': file_key,
+        'dmt': pd.Categorical.from_codes(file_dmt[file_key], categories=list(dmts)),
+        'WaferID': pd.Categorical.from_codes(wafer, categories=list(wafers)),
+        'Slot': slot,
+        'site': site,
+        'XWaferLoc': x,
+        'YWaferLoc': y,
+        **values,
+    }, columns=SITE_COLUMNS + list(values))
+
+    files = pd.DataFrame({
+        'filename': [result['filename'] for result in results],
+        'full_path': [result['path'] for result in results],
+        'dmt': pd.Categorical.from_codes(file_dmt, categories=list(dmts)),
+        'datetime': pd.to_datetime([result['datetime'] for result in results]),
+        **{name: pd.Categorical([result['context'].get(name) for result in results]) for name in CONTEXT_COLUMNS},
+    }, columns=FILE_COLUMNS)
+    return df, files
+
+
+def concat_frames(frames):
+    """Concatenate frames, merging categorical columns.
+
+    Plain pd.concat turns categoricals with different categories into object
+    columns; here their categories are unioned instead. Columns missing from
+    some frames (labels a file didn't have) are filled with NaN.
+    """
+    frames = [frame for frame in frames if frame is not None]
+    if len(frames) == 1:
+        return frames[0].reset_index(drop=True)
+    names = list(dict.fromkeys(column for frame in frames for column in frame.columns))
+    columns = {}
+    for column in names:
+        values = [frame[column] if column in frame.columns else pd.Series(np.full(len(frame), np.nan))
+                  for frame in frames]
+        if all(isinstance(value.dtype, pd.CategoricalDtype) for value in values):
+            columns[column] = union_categoricals([value.array for value in values])
+        else:
+            columns[column] = np.concatenate([value.to_numpy() for value in values])
+    return pd.DataFrame(columns, columns=names)
+
+
+def concat_ingested(parts):
+    """Concatenate (df, files) pairs, renumbering the file keys of later parts"""
+    parts = [part for part in parts if part is not None and len(part[1])]
+    if not parts:
+        return build_frames([])
+    if len(parts) == 1:
+        return parts[0]
+
+    frames, offset = [], 0
+    for df, files in parts:
+        frames.append(df.assign(file_key=(df['file_key'] + offset).astype(np.int32)))
+        offset += len(files)
+    return concat_frames(frames), concat_frames([files for _, files in parts])
@@ -0,0 +1,100 @@
+import fnmatch
+import os
+import re
+import zipfile
+
+import pandas as pd
+
+from dmt_archive import list_members, member_path
+
+# DMT file names encode the run metadata, e.g.
+# 2025-07-08T09.33.59.9790672-W525T8V0-8333-DMT102-TNI111-5051IN009THK.xml
+FILENAME_PATTERN = (
+    r'^(?P<timestamp>\d{4}-\d{2}-\d{2}T\d{2}\.\d{2}\.\d{2})(?:\.\d+)?'
+    r'-(?P<LotID>[^-]+)-(?P<Operation>[^-]+)-(?P<dmt>[^-]+)-(?P<F4Entity>[^-]+)'
+    r'-(?P<TestName>.+)\.xml(?:\.gz)?$'
+)
+
+INDEX_COLUMNS = ['filename', 'full_path', 'timestamp', 'LotID', 'Operation', 'dmt', 'F4Entity', 'TestName']
+
+
+def parse_filenames(names):
+    """Parse DMT file names into a DataFrame of filename metadata.
+
+    Names that don't follow the DMT naming scheme get missing values.
+    """
+    names = pd.Series(names, dtype=object)
+    meta = names.str.extract(FILENAME_PATTERN, expand=True)
+    meta['timestamp'] = pd.to_datetime(meta['timestamp'], format='%Y-%m-%dT%H.%M.%S', errors='coerce')
+    meta.insert(0, 'filename', names)
+    return meta
+
+
+_filename_re = re.compile(FILENAME_PATTERN)
+
+
+def parse_filename(path):
+    """Return the filename metadata of one file as a dict of strings (empty if it doesn't match)"""
+    match = _filename_re.match(os.path.basename(path))
+    return match.groupdict() if match else {}
+
+
+def build_file_index(dirs):
+    """Index the XML files in dirs by the metadata in their names.
+
+    Each directory is listed exactly once with os.scandir, and no XML file
+    is opened or stat'ed, so building the index is cheap even on the network
+    share. ``.xml.gz`` files are indexed like plain ones, and the XML members
+    of ``.zip`` archives by their member names (only the archive's directory
+    is read; see dmt_archive). Directories and archives that can't be read
+    are reported and skipped.
+    """
+    names, paths = [], []
+    for d in dirs:
+        try:
+            with os.scandir(d) as entries:
+                for entry in entries:
+                    name = entry.name.lower()
+                    if name.endswith(('.xml', '.xml.gz')):
+                        names.append(entry.name)
+                        paths.append(entry.path)
+                    elif name.endswith('.zip'):
+                        try:
+                            members = list_members(entry.path)
+                        except (OSError, zipfile.BadZipFile) as e:
+                            print(f"Error reading archive {entry.path}: {e}")
+                            continue
+                        names.extend(os.path.basename(member) for member in members)
+                        paths.extend(member_path(entry.path, member) for member in members)
+        except OSError as e:
+            print(f"Error listing directory {d}: {e}")
+
+    index = parse_filenames(names)
+    index.insert(1, 'full_path', pd.Series(paths, dtype=object))
+    return index[INDEX_COLUMNS]
+
+
+def filter_file_index(index, patterns=None, start=None, end=None, lots=None, operations=None, tools=None):
+    """Select the files of index that match every given filter.
+
+    ``patterns`` are glob patterns matched against the file name, ``start``
+    and ``end`` are dates bounding the filename timestamp (both days
+    inclusive, like dmt_query.filter_mask), and ``lots``, ``operations``
+    and ``tools`` are collections of allowed LotID, Operation and DMT
+    values. Filters left as None are not applied.
+    """
+    mask = pd.Series(True, index=index.index)
+    if patterns:
+        mask &= index['filename'].map(lambda name: any(fnmatch.fnmatch(name, p) for p in patterns))
+    if start is not None:
+        mask &= index['timestamp'] >= pd.Timestamp(start)
+    if end is not None:
+        # end is a whole day: everything stamped on it is included
+        mask &= index['timestamp'] < pd.Timestamp(end) + pd.Timedelta(days=1)
+    if lots is not None:
+        mask &= index['LotID'].isin(lots)
+    if operations is not None:
+        mask &= index['Operation'].isin([str(op) for op in operations])
+    if tools is not None:
+        mask &= index['dmt'].isin(tools)
+    return index[mask]
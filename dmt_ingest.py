@@ -0,0 +1,278 @@
+import multiprocessing
+import os
+import time
+from array import array
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from dmt_archive import open_source
+from dmt_derived import add_derived_columns
+from dmt_frames import CONTEXT_COLUMNS, build_frames, concat_ingested
+from dmt_index import parse_filename
+from dmt_metrics import metrics
+from dmt_parser import DEFAULT_ENGINE, iter_data_records
+from dmt_prefetch import prefetch_files
+
+
+# Parse workers are not forked: the pool is started from threaded processes
+# (the read-ahead threads, the dashboard's loader and server threads), and a
+# forked child could inherit a lock another thread was holding
+_WORKER_CONTEXT = multiprocessing.get_context(
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+
+# ProcTime in the Context block, e.g. 7/8/2025 9:05:01 AM
+PROC_TIME_FORMAT = '%m/%d/%Y %I:%M:%S %p'
+
+
+def dmt_from_path(path):
+    """Determine the DMT tool from the file name, falling back to the path"""
+    dmt = parse_filename(path).get('dmt')
+    if dmt:
+        return dmt
+    if 'DMT102' in path:
+        return 'DMT102'
+    elif 'DMT103' in path:
+        return 'DMT103'
+    return 'Unknown'
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return -1
+
+
+def file_time(context, meta):
+    """The file's ProcTime, falling back to the timestamp in its name (None if neither parses)"""
+    try:
+        return datetime.strptime(context.get('ProcTime') or '', PROC_TIME_FORMAT)
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(meta.get('timestamp') or '', '%Y-%m-%dT%H.%M.%S')
+    except ValueError:
+        return None
+
+
+def parse_file(path, engine=DEFAULT_ENGINE, data=None):
+    """Parse one DMT XML file into a compact per-file result.
+
+    Every site on a wafer is written as a run of sibling DataRecords, one
+    per label. The n-th record of a label on a wafer belongs to that wafer's
+    n-th site, which keys each value to its site row without any string
+    matching.
+
+    The file's Context block is read in the same pass: its ProcTime is the
+    file date/time (no stat of the file is needed) and its LotID,
+    RecipeName, RunId, SessionID and Operation are returned as the file's
+    context, with LotID and Operation falling back to the file name.
+    ``engine`` picks the dmt_parser engine that reads the file, from its
+    bytes ``data`` if they have been read already. ``.xml.gz`` files and zip
+    members (see dmt_archive) are streamed into the parser decompressed.
+
+    Runs in ingest worker processes, so it only returns plain picklable data:
+    the file metadata, typed buffers with one entry per site (wafer codes
+    into a per-file list, site number, slot and coordinates), per label the
+    site rows and values it has, the time parsing took and the error message
+    if the file could not be processed.
+    """
+    start = time.perf_counter()
+    try:
+        meta = parse_filename(path)
+        dmt = dmt_from_path(path)
+        context = {}
+
+        wafers = {}
+        site_rows = {}  # (wafer code, site number) -> site row
+        seen = {}       # (wafer code, label) -> records of that label so far
+        wafer_codes, sites, slots = array('i'), array('i'), array('i')
+        x, y = array('f'), array('f')
+        values = {}     # label -> (site rows, values)
+        # Gzip files and zip members are decompressed as they are parsed
+        with open_source(path) if data is None else nullcontext(data) as source:
+            for data_record in iter_data_records(source, labels=None, context=context, engine=engine):
+                wafer_id = data_record['WaferID']
+                wafer = -1 if wafer_id is None else wafers.setdefault(wafer_id, len(wafers))
+                label = data_record['Label']
+                site = seen.get((wafer, label), 0)
+                seen[(wafer, label)] = site + 1
+
+                row = site_rows.get((wafer, site))
+                if row is None:
+                    row = site_rows[(wafer, site)] = len(site_rows)
+                    wafer_codes.append(wafer)
+                    sites.append(site)
+                    slots.append(_to_int(data_record['Slot']))
+                    x.append(np.nan)
+                    y.append(np.nan)
+                if data_record['XWaferLoc'] is not None:
+                    x[row] = _to_float(data_record['XWaferLoc'])
+                    y[row] = _to_float(data_record['YWaferLoc'])
+
+                try:
+                    datum_val = float(data_record['Datum'])
+                except (TypeError, ValueError):
+                    continue
+                label_rows, label_values = values.setdefault(label, (array('i'), array('d')))
+                label_rows.append(row)
+                label_values.append(datum_val)
+
+        for name in ('LotID', 'Operation'):
+            context[name] = context.get(name) or meta.get(name)
+        return {
+            'path': path,
+            'filename': os.path.basename(path),
+            'dmt': dmt,
+            'datetime': file_time(context, meta),
+            'context': {name: context.get(name) for name in CONTEXT_COLUMNS},
+            'wafers': list(wafers),
+            'wafer_codes': np.frombuffer(wafer_codes, dtype=np.int32),
+            'site': np.frombuffer(sites, dtype=np.int32),
+            'slot': np.frombuffer(slots, dtype=np.int32),
+            'x': np.frombuffer(x, dtype=np.float32),
+            'y': np.frombuffer(y, dtype=np.float32),
+            'values': {label: (np.frombuffer(label_rows, dtype=np.int32), np.frombuffer(label_values, dtype=np.float64))
+                       for label, (label_rows, label_values) in values.items()},
+            'parse_seconds': time.perf_counter() - start,
+            'error': None,
+        }
+    except Exception as e:
+        return {'path': path, 'parse_seconds': time.perf_counter() - start, 'error': str(e)}
+
+
+def iter_parsed_files(files, workers=1, engine=DEFAULT_ENGINE, read_threads=0, read_ahead_mb=256):
+    """Yield parse_file results for files, using a process pool when workers > 1.
+
+    With ``read_threads`` the files' bytes are read ahead by that many
+    threads (see dmt_prefetch), holding at most about ``read_ahead_mb`` of
+    unparsed data, and parsed from memory.
+    """
+    if read_threads:
+        yield from _iter_prefetched(files, workers, engine, read_threads, read_ahead_mb)
+        return
+
+    parse = partial(parse_file, engine=engine)
+    workers = min(workers or 1, len(files))
+    if workers <= 1:
+        for path in files:
+            yield parse(path)
+        return
+
+    # Hand each worker several files per task so small files don't drown in IPC
+    chunksize = max(1, len(files) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_WORKER_CONTEXT) as pool:
+        yield from pool.map(parse, files, chunksize=chunksize)
+
+
+def _iter_prefetched(files, workers, engine, read_threads, read_ahead_mb):
+    reads = prefetch_files(files, threads=read_threads, max_bytes=read_ahead_mb * 2 ** 20)
+    workers = min(workers or 1, len(files))
+    if workers <= 1:
+        for path, data, error in reads:
+            yield parse_file(path, engine, data) if error is None else {'path': path, 'parse_seconds': 0.0, 'error': error}
+        return
+
+    # Only a couple of files per worker are handed over at a time, so the
+    # buffers waiting in the pool stay within the read-ahead limit
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_WORKER_CONTEXT) as pool:
+        queued = deque()
+        for path, data, error in reads:
+            if error is None:
+                queued.append(pool.submit(parse_file, path, engine, data))
+            else:
+                queued.append(Future())
+                queued[-1].set_result({'path': path, 'parse_seconds': 0.0, 'error': error})
+            while len(queued) >= 2 * workers:
+                yield queued.popleft().result()
+        while queued:
+            yield queued.popleft().result()
+
+
+# With a cache, parsed files are built into frames and saved this many at a
+# time, so rows a SiteStore keeps on disk only are never all in memory
+SAVE_BATCH_FILES = 500
+
+
+def _save_batch(results, cache, stats, newest):
+    """Frames of a batch of parse results, saved to the cache and with the rows it evicts dropped"""
+    with metrics.span('frame_build', files=len(results)):
+        df, files = build_frames(results)
+    if cache is not None:
+        with metrics.span('cache_save', files=len(results)):
+            cache.save(df, files, stats)
+        df = cache.evict(df, files, newest)
+    return df, files
+
+
+def ingest_files(files, workers=1, cache=None, engine=DEFAULT_ENGINE, read_threads=0, read_ahead_mb=256):
+    """Parse files and merge the per-file results.
+
+    Returns the site table, with the derived columns added, and the files
+    table (see dmt_frames). Files that fail are reported and left out
+    of both. With a ParseCache, unchanged files are loaded from it and only
+    new or modified files are parsed. All parser engines give the same
+    results, so cached files are valid whichever engine parsed them. A
+    dmt_store.SiteStore can be passed as the cache; only the rows of the
+    files in its in-memory window are returned. Parsed files are saved to
+    the cache in batches of SAVE_BATCH_FILES, and each batch's rows from
+    before the window (as far as it has got yet) are dropped right away.
+    ``read_threads`` and ``read_ahead_mb`` are passed to iter_parsed_files.
+
+    The stages are timed as dmt_metrics spans: 'ingest' for the whole call
+    and 'parse' per file, plus the cache, frame build and derived columns.
+    """
+    with metrics.span('ingest') as counts:
+        if cache is not None:
+            with metrics.span('cache_split'):
+                hits, to_parse, stats = cache.split(files)
+            print(f"Parse cache: {len(hits)} files cached, {len(to_parse)} to parse")
+        else:
+            hits, to_parse, stats = [], files, {}
+
+        # Files are parsed in worker processes; their parse times are recorded here
+        results, batches = [], []
+        records = 0
+        newest = None  # newest file date/time parsed so far
+        for result in iter_parsed_files(to_parse, workers, engine, read_threads, read_ahead_mb):
+            if result['error'] is not None:
+                metrics.add('parse', result['parse_seconds'], error=True, files=1)
+                print(f"Error processing file {result['path']}: {result['error']}")
+                continue
+            file_records = sum(len(rows) for rows, _ in result['values'].values())
+            metrics.add('parse', result['parse_seconds'], files=1, records=file_records)
+            records += file_records
+            results.append(result)
+            if result['datetime'] is not None and (newest is None or result['datetime'] > newest):
+                newest = result['datetime']
+            if cache is not None and len(results) >= SAVE_BATCH_FILES:
+                batches.append(_save_batch(results, cache, stats, pd.Timestamp(newest) if newest else None))
+                results = []
+        batches.append(_save_batch(results, cache, stats, pd.Timestamp(newest) if newest else None))
+
+        if cache is not None:
+            with metrics.span('cache_load', files=len(hits)):
+                cached = cache.get(hits)
+            df, files = concat_ingested([cached, *batches])
+            df = cache.evict(df, files)
+        else:
+            df, files = batches[0]
+
+        # Derived columns are recomputed on load rather than cached
+        with metrics.span('derived_columns', sites=len(df)):
+            df = add_derived_columns(df)
+        counts.update(files=len(files), records=records, sites=len(df))
+    return df, files
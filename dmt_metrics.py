@@ -0,0 +1,134 @@
+"""Timing and counting spans for the DMT pipeline and dashboard.
+
+Wrap a stage in ``with metrics.span('parse', files=1, records=n):`` (or
+decorate a function with ``@metrics.timed()``) and its calls, total and
+slowest time and counts are kept in the module-level ``metrics`` registry.
+Counts are summed per span, so their rates (e.g. files/sec) are over all
+the time spent in it. ``metrics.snapshot()`` returns everything as a
+JSON-ready dict, together with the process memory and its high-water mark.
+"""
+import functools
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def memory_mb():
+    """(current, peak) resident memory of this process in MB, None where unknown"""
+    current = peak = None
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        current = info.rss / 2 ** 20
+        peak = getattr(info, 'peak_wset', None)  # Windows
+        peak = peak and peak / 2 ** 20
+    elif os.path.exists('/proc/self/statm'):
+        with open('/proc/self/statm') as f:
+            current = int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    if peak is None and resource is not None:
+        # ru_maxrss is in kB on Linux and bytes on macOS
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak = maxrss / 2 ** 20 if sys.platform == 'darwin' else maxrss / 2 ** 10
+    return current, peak
+
+
+class Metrics:
+    """Thread-safe registry of timing spans.
+
+    Each span name keeps its number of calls and errors, total, slowest and
+    last time, and the sum of every count passed to it. With ``memory`` the
+    resident memory is sampled after each span and the highest sample kept
+    per span and overall.
+    """
+
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._spans = {}
+        self._memory_high = None
+
+    def add(self, name, seconds, error=False, **counts):
+        """Record one call of a span that was timed elsewhere (e.g. in a worker process)"""
+        current = memory_mb()[0] if self.memory else None
+        with self._lock:
+            span = self._spans.get(name)
+            if span is None:
+                span = self._spans[name] = {'calls': 0, 'errors': 0, 'seconds': 0.0, 'max_seconds': 0.0,
+                                            'last_seconds': 0.0, 'memory_high_mb': None, 'counts': {}}
+            span['calls'] += 1
+            span['errors'] += bool(error)
+            span['seconds'] += seconds
+            span['max_seconds'] = max(span['max_seconds'], seconds)
+            span['last_seconds'] = seconds
+            for key, count in counts.items():
+                span['counts'][key] = span['counts'].get(key, 0) + count
+            if current is not None:
+                span['memory_high_mb'] = max(span['memory_high_mb'] or 0.0, current)
+                self._memory_high = max(self._memory_high or 0.0, current)
+
+    @contextmanager
+    def span(self, name, **counts):
+        """Time the block as one call of span ``name``.
+
+        Counts can be passed up front or set on the yielded dict once known
+        (``with metrics.span('ingest') as counts: ... counts['files'] = n``).
+        """
+        counts = dict(counts)
+        start = time.perf_counter()
+        error = False
+        try:
+            yield counts
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.add(name, time.perf_counter() - start, error, **counts)
+
+    def timed(self, name=None):
+        """Decorator timing each call of a function as span ``name`` (default: the function's name)"""
+        def decorate(func):
+            span_name = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def reset(self):
+        with self._lock:
+            self._spans = {}
+            self._memory_high = None
+
+    def snapshot(self):
+        """All spans with their mean time and count rates, plus the process memory"""
+        with self._lock:
+            spans = {name: {**span, 'counts': dict(span['counts'])} for name, span in self._spans.items()}
+            memory_high = self._memory_high
+        for span in spans.values():
+            span['mean_seconds'] = span['seconds'] / span['calls']
+            for key, count in list(span['counts'].items()):
+                span['counts'][f'{key}_per_sec'] = count / span['seconds'] if span['seconds'] else None
+        current, peak = memory_mb()
+        return {
+            'uptime_seconds': time.time() - self.started,
+            'memory': {'current_mb': current, 'high_water_mb': memory_high, 'process_peak_mb': peak},
+            'spans': dict(sorted(spans.items())),
+        }
+
+
+# Registry shared by the pipeline modules and the app
+metrics = Metrics()
@@ -0,0 +1,175 @@
+import io
+import re
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape, unescape
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_etree = None
+
+# Labels the dashboard actually uses; everything else in the file is skipped
+WANTED_LABELS = ('Layer 1 Thickness', 'Goodness-of-Fit')
+
+# DataRecord children we keep for each wanted record
+RECORD_FIELDS = ('Label', 'Datum', 'WaferID', 'Slot', 'XWaferLoc', 'YWaferLoc')
+
+# Children of the file's Context block we keep (the run metadata)
+CONTEXT_FIELDS = ('ProcTime', 'LotID', 'RecipeName', 'RunId', 'SessionID', 'Operation')
+
+DEFAULT_ENGINE = 'etree'
+
+
+def iter_data_records(source, labels=WANTED_LABELS, fields=RECORD_FIELDS, context=None, engine=DEFAULT_ENGINE):
+    """Stream the DataRecord elements of a DMT XML file.
+
+    Yields one dict of ``fields`` per DataRecord whose Label is in ``labels``
+    (all records when ``labels`` is None). The XML engines read the file
+    incrementally and clear each DataRecord as soon as it has been read; the
+    scanner holds the raw bytes of one file, never any elements.
+
+    If ``context`` is a dict, the CONTEXT_FIELDS of the file's Context block
+    are stored in it (None when missing) in the same pass; the Context comes
+    before the records, so it is filled by the time the first one is yielded.
+
+    ``engine`` names one of PARSER_ENGINES; they all give the same output.
+    ``source`` is a path, a binary file object or the file's bytes.
+    """
+    try:
+        records = PARSER_ENGINES[engine]
+    except KeyError:
+        raise ValueError(f"Unknown parser engine {engine!r} (available: {', '.join(PARSER_ENGINES)})") from None
+    if isinstance(source, (bytes, bytearray, memoryview)) and engine != 'scan':
+        source = io.BytesIO(source)
+    return records(source, labels, fields, context)
+
+
+def _etree_records(source, labels, fields, context):
+    """Reference engine: xml.etree iterparse"""
+    wanted = None if labels is None else frozenset(labels)
+    # Cleared records are also detached from the RecordList, which would
+    # otherwise keep an empty element for every record of the file
+    record_list = None
+    for event, elem in ET.iterparse(source, events=('start', 'end')):
+        if event == 'start':
+            if elem.tag == 'RecordList':
+                record_list = elem
+            continue
+        if elem.tag == 'Context':
+            if context is not None:
+                values = {child.tag: child.text for child in elem}
+                context.update({field: values.get(field) for field in CONTEXT_FIELDS})
+            elem.clear()
+            continue
+        if elem.tag != 'DataRecord':
+            continue
+        values = {child.tag: child.text for child in elem}
+        if wanted is None or values.get('Label') in wanted:
+            yield {field: values.get(field) for field in fields}
+        elem.clear()
+        if record_list is not None:
+            del record_list[-1]
+
+
+def _lxml_records(source, labels, fields, context):
+    """lxml iterparse, only reporting Context and DataRecord elements"""
+    wanted = None if labels is None else frozenset(labels)
+    for _, elem in lxml_etree.iterparse(source, events=('end',), tag=('Context', 'DataRecord')):
+        values = {child.tag: child.text for child in elem}
+        if elem.tag == 'Context':
+            if context is not None:
+                context.update({field: values.get(field) for field in CONTEXT_FIELDS})
+        elif wanted is None or values.get('Label') in wanted:
+            yield {field: values.get(field) for field in fields}
+        # Drop the element and the records before it, which lxml keeps otherwise
+        elem.clear()
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+
+
+_CONTEXT_RE = re.compile(rb'<Context(?:\s[^>]*)?>(.*?)</Context>', re.S)
+_LABEL_RE = re.compile(rb'<Label>([^<]*)</Label>')
+_FIELD_RE = re.compile(rb'<(\w+)(?:\s[^>/]*)?>([^<]*)</\1>')
+# First element of the document, after any XML declaration
+_ROOT_RE = re.compile(rb'<([A-Za-z_][\w.:-]*)')
+
+
+def _field_re(field):
+    return re.compile(b'<' + field.encode() + rb'>([^<]*)</' + field.encode() + b'>')
+
+
+def _text(value):
+    """Element text from raw bytes, as ElementTree would give it"""
+    if not value:
+        return None
+    text = value.decode('utf-8')
+    return unescape(text, {'&quot;': '"', '&apos;': "'"}) if '&' in text else text
+
+
+def _read_bytes(source):
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    if hasattr(source, 'read'):
+        return source.read()
+    with open(source, 'rb') as f:
+        return f.read()
+
+
+def _check_complete(data):
+    """Raise ParseError, like the XML engines, unless data is a whole document.
+
+    A file the tool is still writing is cut off somewhere: the root element
+    is left open, and possibly the RecordList and the last DataRecord too.
+    """
+    root = _ROOT_RE.search(data)
+    if root is None or not data.rstrip().endswith(b'</' + root.group(1) + b'>'):
+        raise ET.ParseError("incomplete document: no closing root element")
+    if data.count(b'<RecordList') != data.count(b'</RecordList>'):
+        raise ET.ParseError("incomplete document: unclosed RecordList")
+    if data.count(b'<DataRecord') != data.count(b'</DataRecord>'):
+        raise ET.ParseError("incomplete document: unclosed DataRecord")
+
+
+def _scan_records(source, labels, fields, context):
+    """Byte-level scanner for the flat layout DMT tools write.
+
+    Finds each Label in the raw bytes first; records with other labels are
+    skipped without looking at the rest of them or building any elements,
+    and only the wanted fields of the others are read. Only leaf fields of
+    the Context and the records are read, which is all the DMT layout has.
+    The document is checked to be complete first, so a file that is still
+    being written fails like it does with the XML engines.
+    """
+    data = _read_bytes(source)
+    _check_complete(data)
+    if context is not None:
+        match = _CONTEXT_RE.search(data)
+        values = {}
+        if match:
+            # Direct children come before nested ones (e.g. BatchUnit/LotID)
+            for tag, value in _FIELD_RE.findall(match.group(1)):
+                values.setdefault(tag.decode(), value)
+        context.update({field: _text(values.get(field)) for field in CONTEXT_FIELDS})
+
+    wanted = None if labels is None else frozenset(escape(label).encode('utf-8') for label in labels)
+    field_res = [(field, _field_re(field)) for field in fields]
+    for label in _LABEL_RE.finditer(data):
+        if wanted is not None and label.group(1) not in wanted:
+            continue
+        # The record around the label
+        start = data.rfind(b'<DataRecord', 0, label.start())
+        end = data.find(b'</DataRecord>', label.end())
+        if start < 0 or end < 0:
+            continue
+        block = data[start:end]
+        record = {}
+        for field, field_re in field_res:
+            match = field_re.search(block)
+            record[field] = match and _text(match.group(1))
+        yield record
+
+
+# name -> function(source, labels, fields, context) yielding record dicts
+PARSER_ENGINES = {'etree': _etree_records, 'scan': _scan_records}
+if lxml_etree is not None:
+    PARSER_ENGINES['lxml'] = _lxml_records
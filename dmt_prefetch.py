@@ -0,0 +1,65 @@
+"""Read files ahead of the parser with a bounded pool of threads.
+
+On a network share most of the time spent on a file is waiting for it to
+arrive. Reading the raw bytes of the next files in threads while the
+current one is parsed keeps both the link and the parser busy. The number
+of reads in flight and the bytes held in memory are both bounded.
+"""
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from dmt_archive import read_source
+from dmt_metrics import metrics
+
+# Size assumed for files not read yet when checking the memory limit
+_DEFAULT_FILE_BYTES = 2 ** 20
+
+
+def read_file(path):
+    """(XML bytes, None) of a file, or (None, error message) if it can't be read.
+
+    Gzip files and zip members are decompressed here (zlib runs outside the
+    GIL), so only their compressed bytes cross the network.
+    """
+    start = time.perf_counter()
+    try:
+        data = read_source(path)
+    except (OSError, EOFError, KeyError, zipfile.BadZipFile) as e:
+        metrics.add('read', time.perf_counter() - start, error=True, files=1)
+        return None, str(e)
+    metrics.add('read', time.perf_counter() - start, files=1, bytes=len(data))
+    return data, None
+
+
+def prefetch_files(paths, threads=8, max_bytes=256 * 2 ** 20):
+    """Yield (path, bytes, error) for paths, in order, reading ahead in threads.
+
+    Up to ``threads`` files are read at once and at most 4 * threads are
+    kept ahead of the consumer. New reads only start while the files read
+    but not yet consumed (unread ones counted at the mean size so far) come
+    to less than ``max_bytes``; the next file is always read, however big.
+    bytes is None and error the message for files that can't be read.
+    """
+    paths = list(paths)
+    ahead = deque()  # (path, future) in path order
+    read_bytes = read_files = 0
+
+    def reserved():
+        estimate = read_bytes / read_files if read_files else _DEFAULT_FILE_BYTES
+        return sum(len(future.result()[0] or b'') if future.done() else estimate for _, future in ahead)
+
+    with ThreadPoolExecutor(max_workers=max(1, threads), thread_name_prefix='dmt-read') as pool:
+        position = 0
+        while position < len(paths) or ahead:
+            while (position < len(paths) and len(ahead) < 4 * max(1, threads)
+                   and (not ahead or reserved() < max_bytes)):
+                ahead.append((paths[position], pool.submit(read_file, paths[position])))
+                position += 1
+            path, future = ahead.popleft()
+            data, error = future.result()
+            if data is not None:
+                read_bytes += len(data)
+                read_files += 1
+            yield path, data, error
@@ -0,0 +1,171 @@
+"""Radial thickness profiles of wafers.
+
+A profile is a smoothing spline of a label (Layer 1 Thickness) against
+RADIUS, fitted per wafer and file, with the smoothing picked automatically
+by generalized cross-validation. Every profile is evaluated on the same
+radius grid, so a set of profiles is one 2-D array (one row per wafer and
+file) and metrics like the center-to-edge delta are computed on the whole
+array at once.
+"""
+import functools
+
+import numpy as np
+from scipy.interpolate import make_smoothing_spline
+
+from dmt_wafercache import WaferCache
+
+PROFILE_LABEL = 'Layer 1 Thickness'
+
+# Radii (mm) every profile is evaluated at; NaN outside the measured radii
+PROFILE_RADII = np.linspace(0.0, 150.0, 301)
+
+# Sites whose radii round to the same multiple of this (mm) form one ring;
+# their values are averaged and the ring is weighted by its number of sites.
+# Duplicate radii (every site of a ring) are what make a plain spline fail.
+RADIUS_RESOLUTION_MM = 0.01
+
+# Edge roll-off: change of the profile over this many mm inside the outermost ring
+EDGE_WINDOW_MM = 10.0
+
+# The smoothing spline needs 5 rings; with 2-4 a line or parabola is fitted
+MIN_SPLINE_RINGS = 5
+
+# Smoothing levels (lambda, for radii scaled by the grid's outer radius)
+# each wafer's smoothing is chosen from, by generalized cross-validation
+SMOOTHING_LEVELS = np.logspace(-8, 2, 41)
+
+# Per-profile values, in the column order of the metrics arrays
+PROFILE_METRICS = ['sites', 'rings', 'center_radius', 'edge_radius', 'center', 'edge',
+                   'center_to_edge', 'edge_rolloff']
+
+
+def fit_profile(radius, values, grid=PROFILE_RADII):
+    """Fit one wafer's radial profile; returns (curve, metrics), see fit_profiles"""
+    curves, metrics = fit_profiles([(radius, values)], grid)
+    return curves[0], metrics[0]
+
+
+def _ring_points(rings, grid):
+    """Radii a layout's fits are evaluated at: the grid, then the center, edge and roll-off window start"""
+    return np.concatenate([grid, [rings[0], rings[-1], max(rings[0], rings[-1] - EDGE_WINDOW_MM)]])
+
+
+@functools.lru_cache(maxsize=64)
+def _smoothers(ring_keys, counts, grid):
+    """Linear maps from a layout's ring means to its smoothing splines.
+
+    The spline of a smoothing level is linear in the ring means, so fitting
+    the identity gives, per level, the matrix to the fitted ring values, its
+    trace (the fit's degrees of freedom) and the matrix to the values at
+    _ring_points. Every wafer with the same rings shares them.
+    """
+    rings = np.frombuffer(ring_keys, dtype=np.int64) * RADIUS_RESOLUTION_MM
+    counts = np.frombuffer(counts, dtype=np.int64).astype(np.float64)
+    grid = np.frombuffer(grid)
+    scale = grid[-1] or 1.0
+    points = _ring_points(rings, grid) / scale
+    identity = np.eye(len(rings))
+    fitted, at_points = [], []
+    for level in SMOOTHING_LEVELS:
+        spline = make_smoothing_spline(rings / scale, identity, w=counts, lam=level)
+        fitted.append(spline(rings / scale))
+        at_points.append(spline(points))
+    fitted = np.array(fitted)
+    return fitted, np.trace(fitted, axis1=1, axis2=2), np.array(at_points)
+
+
+def _fit_layout(ring_keys, counts, means, grid):
+    """Fit every wafer of one ring layout; means is (rings, wafers). Returns values at _ring_points, (points, wafers)."""
+    rings = ring_keys * RADIUS_RESOLUTION_MM
+    if len(rings) < MIN_SPLINE_RINGS:
+        points = _ring_points(rings, grid)
+        degree = min(2, len(rings) - 1)
+        coefs = np.polynomial.polynomial.polyfit(rings, means, degree, w=np.sqrt(counts))
+        return np.polynomial.polynomial.polyval(points, coefs).T
+
+    fitted, traces, at_points = _smoothers(ring_keys.tobytes(), counts.tobytes(), grid.tobytes())
+    # Weighted GCV score of every level for every wafer at once
+    residuals = means[None, :, :] - fitted @ means
+    n = len(rings)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scores = (counts[None, :, None] * residuals ** 2).sum(axis=1) / n / (1 - traces[:, None] / n) ** 2
+    scores[~np.isfinite(scores)] = np.inf
+    best = np.argmin(scores, axis=0)
+    values = np.empty((at_points.shape[1], means.shape[1]))
+    for level in np.unique(best):
+        wafers = best == level
+        values[:, wafers] = at_points[level] @ means[:, wafers]
+    return values
+
+
+def fit_profiles(groups, grid=PROFILE_RADII):
+    """Fit radial profiles for a list of (radius, values) arrays, one per wafer.
+
+    Returns (curves, metrics) arrays with one row per group: the fitted
+    values at ``grid`` (NaN outside the measured radii) and the
+    PROFILE_METRICS, NaN when a wafer has fewer than two distinct radii. The
+    center and edge values are the profile at the innermost and outermost
+    ring; the center-to-edge delta is edge - center and the edge roll-off is
+    the change over the outermost EDGE_WINDOW_MM.
+
+    Wafers are fitted in batches of identical ring layouts (typically all
+    wafers of a recipe), each batch with a few matrix products.
+    """
+    grid = np.asarray(grid, dtype=np.float64)
+    curves = np.full((len(groups), len(grid)), np.nan)
+    metrics = np.full((len(groups), len(PROFILE_METRICS)), np.nan)
+    layouts = {}  # (ring keys, counts) -> [(group, ring means)]
+    for i, (radius, values) in enumerate(groups):
+        radius = np.asarray(radius, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        valid = ~(np.isnan(radius) | np.isnan(values))
+        radius, values = radius[valid], values[valid]
+        ring_keys, inverse, counts = np.unique(np.rint(radius / RADIUS_RESOLUTION_MM).astype(np.int64),
+                                               return_inverse=True, return_counts=True)
+        metrics[i, :2] = len(radius), len(ring_keys)
+        if len(ring_keys) >= 2:
+            means = np.bincount(inverse, values) / counts
+            layouts.setdefault((ring_keys.tobytes(), counts.tobytes()), []).append((i, means))
+
+    for (ring_keys, counts), fits in layouts.items():
+        ring_keys, counts = np.frombuffer(ring_keys, dtype=np.int64), np.frombuffer(counts, dtype=np.int64)
+        rows = [i for i, _ in fits]
+        values = _fit_layout(ring_keys, counts, np.column_stack([means for _, means in fits]), grid)
+        rings = ring_keys * RADIUS_RESOLUTION_MM
+        inside = (grid >= rings[0]) & (grid <= rings[-1])
+        curves[np.ix_(rows, np.flatnonzero(inside))] = values[:len(grid)][inside].T
+        center, edge, window = values[len(grid):]
+        metrics[rows, 2:] = np.column_stack([np.full(len(rows), rings[0]), np.full(len(rows), rings[-1]),
+                                             center, edge, edge - center, edge - window])
+    return curves, metrics
+
+
+class ProfileCache(WaferCache):
+    """Fitted profiles kept by file (path and date/time) and WaferID (see WaferCache).
+
+    The least recently used profiles beyond ``max_profiles`` are dropped.
+    """
+
+    def __init__(self, grid=PROFILE_RADII, label=PROFILE_LABEL, max_profiles=20000):
+        super().__init__(label, max_items=max_profiles)
+        self.grid = grid
+
+    def usable(self, rows):
+        return (rows[self.label].notna() & rows['RADIUS'].notna()).to_numpy()
+
+    def compute(self, rows, wafers):
+        radius, values = rows['RADIUS'].to_numpy(), rows[self.label].to_numpy()
+        curves, metrics = fit_profiles([(radius[positions], values[positions]) for positions in wafers], self.grid)
+        return list(zip(curves, metrics))
+
+    def get(self, rows, files):
+        """Profiles of the wafers in a site table.
+
+        Returns a frame with one row per file and wafer in ``rows`` (its
+        file_key, dmt, WaferID and the PROFILE_METRICS) and the curves array
+        aligned with it.
+        """
+        table, results = super().get(rows, files)
+        curves = np.array([curve for curve, _ in results]).reshape(len(results), len(self.grid))
+        table[PROFILE_METRICS] = np.array([metrics for _, metrics in results]).reshape(len(results), len(PROFILE_METRICS))
+        return table, curves
@@ -0,0 +1,133 @@
+import collections
+import functools
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Columns the dashboard can filter on; files table columns are matched once
+# per file, site table columns (WaferID) per site
+FILTER_COLUMNS = ('dmt', 'LotID', 'RecipeName', 'WaferID')
+
+# Filter key matching everything
+NO_FILTERS = (None, None, ())
+
+
+def filter_key(state):
+    """Hashable, normalized form of a filter state.
+
+    state is a dict with optional 'start' and 'end' dates ('YYYY-MM-DD',
+    both inclusive) and a list of wanted values per FILTER_COLUMNS name.
+    Empty selections are dropped and values are sorted, so equal filters
+    give equal keys and can be used to memoize queries.
+    """
+    state = state or {}
+    values = tuple((name, tuple(sorted(str(value) for value in state[name])))
+                   for name in FILTER_COLUMNS if state.get(name))
+    return state.get('start') or None, state.get('end') or None, values
+
+
+def file_mask(files, key):
+    """Boolean mask of the files of a files table matching the file-level part of a filter_key.
+
+    The dates and the values of files table columns are matched; values of
+    site table columns (WaferID) are left to filter_mask.
+    """
+    start, end, values = key
+    mask = np.ones(len(files), dtype=bool)
+    if start:
+        mask &= (files['datetime'] >= pd.Timestamp(start)).to_numpy()
+    if end:
+        mask &= (files['datetime'] < pd.Timestamp(end) + pd.Timedelta(days=1)).to_numpy()
+    for name, wanted in values:
+        if name in files.columns:
+            mask &= files[name].astype(str).isin(wanted).to_numpy()
+    return mask
+
+
+def site_filters(files, key):
+    """(column, wanted values) pairs of the site-level part of a filter_key (columns not in the files table)"""
+    return [(name, wanted) for name, wanted in key[2] if name not in files.columns]
+
+
+def filter_mask(df, files, key):
+    """Boolean mask of the site rows of df matching a filter_key"""
+    mask = file_mask(files, key)[df['file_key'].to_numpy()]
+    for name, wanted in site_filters(files, key):
+        if name in df.columns:
+            mask &= df[name].isin(wanted).to_numpy()
+    return mask
+
+
+def filter_options(df, files):
+    """Sorted values present in the data for each filter column it has"""
+    options = {}
+    for name in FILTER_COLUMNS:
+        if name in files.columns:
+            column = files[name]
+        elif name in df.columns:
+            column = df[name]
+        else:
+            options[name] = []
+            continue
+        options[name] = sorted(str(value) for value in column.dropna().unique())
+    return options
+
+
+def memoize_version(maxsize, max_bytes=None):
+    """Decorator memoizing a function of (data, *args) for the newest data version only.
+
+    data is anything with a ``version``. Results are keyed by the other
+    arguments and kept (at most maxsize, least recently used out first)
+    until a call with a newer version drops them all, so old versions'
+    frames aren't held on to. A call with an older version (a callback still
+    working on the data it started with) is computed but not kept. With
+    max_bytes, the frames kept add up to at most that many bytes; a frame
+    that is data's own ``df`` costs nothing.
+    """
+    def decorator(function):
+        return VersionMemo(function, maxsize, max_bytes)
+    return decorator
+
+
+class VersionMemo:
+    """Thread-safe memo of one function for the newest data version, see memoize_version"""
+
+    def __init__(self, function, maxsize, max_bytes=None):
+        functools.update_wrapper(self, function)
+        self.function = function
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.version = None
+        self.nbytes = 0
+        self._results = collections.OrderedDict()  # key -> (result, bytes)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._results)
+
+    def __call__(self, data, *args, **kwargs):
+        key = args + tuple(sorted(kwargs.items()))
+        with self._lock:
+            if self.version is None or data.version > self.version:
+                self.version = data.version
+                self._results.clear()
+                self.nbytes = 0
+            if data.version == self.version and key in self._results:
+                self._results.move_to_end(key)
+                return self._results[key][0]
+
+        result = self.function(data, *args, **kwargs)
+        size = 0
+        if isinstance(result, pd.DataFrame) and result is not getattr(data, 'df', None):
+            size = int(result.memory_usage(index=True).sum())
+        with self._lock:
+            if data.version != self.version or key in self._results:
+                return result
+            if self.max_bytes is not None and size > self.max_bytes:
+                return result
+            self._results[key] = (result, size)
+            self.nbytes += size
+            while len(self._results) > self.maxsize or (self.max_bytes is not None and self.nbytes > self.max_bytes):
+                self.nbytes -= self._results.popitem(last=False)[1][1]
+        return result
@@ -0,0 +1,310 @@
+"""Write the dashboard's analyses as static files, without a Dash server.
+
+Usage::
+
+    python dmt_report.py OUTPUT_DIR DIR [DIR ...] [--pattern GLOB ...] [--workers N] [--png]
+
+Writes one HTML page per section and per wafer, the summary table as
+HTML, and the site, files, summary and radial profile tables as Parquet.
+Outputs whose input rows haven't changed since the last run are skipped.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from dmt_cache import ParseCache
+from dmt_figures import boxplot_figure, radius_figure, scatter_figure
+from dmt_frames import FILE_COLUMNS
+from dmt_index import build_file_index, filter_file_index
+from dmt_ingest import ingest_files
+from dmt_parser import DEFAULT_ENGINE, PARSER_ENGINES
+from dmt_profile import PROFILE_LABEL, ProfileCache
+from dmt_summary import GOF_THRESHOLD, summarize
+
+try:
+    import kaleido  # noqa: F401  (image export engine used by plotly)
+except ImportError:
+    kaleido = None
+
+# Bump when the report outputs change, so the next run redraws everything
+REPORT_VERSION = 2
+
+MANIFEST_NAME = 'report-manifest.json'
+
+# Boxplot labels, as (output name, label)
+BOXPLOT_LABELS = [('boxplot-thickness', 'Layer 1 Thickness'), ('boxplot-gof', 'Goodness-of-Fit')]
+
+
+def safe_name(name):
+    """File-name-safe version of a wafer ID or section name"""
+    return re.sub(r'[^\w.-]', '_', str(name))
+
+
+# Site columns each figure kind draws; only these are hashed and sent to workers
+JOB_COLUMNS = {
+    'boxplot': ['file_key', 'dmt'],
+    'scatter': ['file_key', 'dmt', 'WaferID', 'Goodness-of-Fit', 'Layer 1 Thickness'],
+    'radius': ['file_key', 'dmt', 'RADIUS', 'Layer 1 Thickness'],
+}
+
+# Site columns the radial profiles are fitted from
+PROFILE_COLUMNS = ['file_key', 'WaferID', 'RADIUS', PROFILE_LABEL]
+
+
+class RowHashes:
+    """Per-row hashes of chosen site columns, each column hashed only once.
+
+    A row's file is hashed by its path and date/time rather than its
+    file_key, which depends on the order files were loaded in.
+    """
+
+    def __init__(self, df, files):
+        self.df = df
+        self._files = pd.util.hash_pandas_object(files[['full_path', 'datetime']], index=False).to_numpy()
+        self._columns = {}
+
+    def column(self, name):
+        if name not in self._columns:
+            if name == 'file_key':
+                self._columns[name] = self._files[self.df['file_key'].to_numpy()]
+            else:
+                self._columns[name] = pd.util.hash_pandas_object(self.df[name], index=False).to_numpy()
+        return self._columns[name]
+
+    def rows(self, columns, positions):
+        hashes = np.zeros(len(positions), dtype=np.uint64)
+        for name in columns:
+            hashes = hashes * np.uint64(1000003) ^ self.column(name)[positions]
+        return hashes
+
+
+def fingerprint(hashes, *params):
+    """Fingerprint of a job's input rows (their hashes, in any order) and parameters"""
+    digest = hashlib.sha1(np.sort(hashes).tobytes())
+    digest.update(repr((REPORT_VERSION,) + params).encode())
+    return digest.hexdigest()
+
+
+def wafer_profiles(df, files):
+    """Radial profiles of every wafer and file, fitted in one batch (None without thickness data)"""
+    if PROFILE_LABEL not in df.columns:
+        return None
+    return ProfileCache().get(df, files)
+
+
+def report_jobs(df, files, sample_points=500, gof_threshold=GOF_THRESHOLD, profiles=None):
+    """Figure jobs for the report: one per section and one per wafer and plot.
+
+    Each job is a dict with the output name, the figure kind and its
+    parameters, the rows and columns it draws and the fingerprint of those.
+    Radius jobs also get the wafer's part of ``profiles`` (from
+    wafer_profiles), which follows from the rows they draw.
+    """
+    hashes = RowHashes(df, files)
+    times = files[['datetime']]
+    jobs = []
+
+    def add(name, kind, mask, profiles=None, **params):
+        positions = np.flatnonzero(mask)
+        columns = JOB_COLUMNS[kind] + ([params['label']] if 'label' in params else [])
+        jobs.append({'name': name, 'kind': kind, 'rows': df.iloc[positions][columns], 'files': times, 'params': params,
+                     'profiles': profiles,
+                     'fingerprint': fingerprint(hashes.rows(columns, positions), name, kind, sorted(params.items()))})
+
+    for name, label in BOXPLOT_LABELS:
+        if label in df.columns:
+            add(name, 'boxplot', df[label].notna().to_numpy(), label=label,
+                title=f'Boxplot of {label} over Time', sample_points=sample_points)
+
+    if 'Goodness-of-Fit' in df.columns and 'Layer 1 Thickness' in df.columns:
+        paired = (df['Goodness-of-Fit'].notna() & df['Layer 1 Thickness'].notna()).to_numpy()
+        add('scatter', 'scatter', paired, gof_threshold=gof_threshold)
+
+    # Per-wafer figures: row positions of each wafer from one groupby
+    wafers = df.groupby('WaferID', observed=True).indices
+    profile_rows = {} if profiles is None else profiles[0].groupby('WaferID').indices
+    for wafer_id in sorted(wafers):
+        mask = np.zeros(len(df), dtype=bool)
+        mask[wafers[wafer_id]] = True
+        if 'Layer 1 Thickness' in df.columns:
+            radius_mask = mask & df['Layer 1 Thickness'].notna().to_numpy() & df['RADIUS'].notna().to_numpy()
+            if radius_mask.sum() >= 3:
+                positions = profile_rows.get(wafer_id)
+                wafer_profiles = None if positions is None else (profiles[0].iloc[positions], profiles[1][positions])
+                add(f'radius-thickness-{safe_name(wafer_id)}', 'radius', radius_mask, wafer_profiles, wafer_id=wafer_id)
+        if 'Goodness-of-Fit' in df.columns:
+            gof_mask = mask & df['Goodness-of-Fit'].notna().to_numpy()
+            if gof_mask.any():
+                add(f'wafer-gof-{safe_name(wafer_id)}', 'boxplot', gof_mask, label='Goodness-of-Fit',
+                    title=f'Goodness-of-Fit - WaferID: {wafer_id}', sample_points=sample_points)
+    return jobs
+
+
+def job_outputs(output_dir, job, png):
+    paths = [os.path.join(output_dir, f"{job['name']}.html")]
+    if png:
+        paths.append(os.path.join(output_dir, f"{job['name']}.png"))
+    return paths
+
+
+def render_job(job, output_dir, png=False):
+    """Draw one job's figure and write it as HTML (and PNG); run in a worker process"""
+    rows, files, params = job['rows'], job['files'], job['params']
+    if job['kind'] == 'boxplot':
+        fig = boxplot_figure(rows, files, params['label'], params['title'], sample_points=params['sample_points'])
+    elif job['kind'] == 'scatter':
+        fig = scatter_figure(rows, files, gof_threshold=params['gof_threshold'])
+    else:
+        fig = radius_figure(rows, files, params['wafer_id'], job['profiles'])
+
+    html_path, *png_path = job_outputs(output_dir, job, png)
+    # The plotly.js bundle is written once next to the pages (write_plotlyjs)
+    fig.write_html(html_path, include_plotlyjs='directory')
+    if png_path:
+        fig.write_image(png_path[0])
+    return job['name']
+
+
+def _render(args):
+    return render_job(*args)
+
+
+def write_plotlyjs(output_dir):
+    path = os.path.join(output_dir, 'plotly.min.js')
+    if not os.path.exists(path):
+        from plotly.offline import get_plotlyjs
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(get_plotlyjs())
+
+
+def load_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(output_dir, manifest):
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def profile_table(files, profiles):
+    """Profile metrics per wafer and file, with the file's name and date/time"""
+    table = profiles[0]
+    file_info = files[['filename', 'datetime']].iloc[table['file_key'].to_numpy()].reset_index(drop=True)
+    return pd.concat([file_info, table.drop(columns='file_key')], axis=1)
+
+
+def write_tables(output_dir, df, files, summary, manifest, fingerprints, profiles=None):
+    """Write the site, files, summary and profile tables as Parquet, plus the summary as HTML"""
+    summary.to_html(os.path.join(output_dir, 'summary.html'), index=False, float_format='%.4f')
+    if ParseCache.available():
+        tables = {'sites': df, 'files': files[FILE_COLUMNS], 'summary': summary}
+        if profiles is not None:
+            tables['profiles'] = profile_table(files, profiles)
+        for name, table in tables.items():
+            path = os.path.join(output_dir, f'{name}.parquet')
+            if manifest.get(f'{name}.parquet') == fingerprints[name] and os.path.exists(path):
+                continue
+            table.to_parquet(path, index=False)
+            manifest[f'{name}.parquet'] = fingerprints[name]
+    else:
+        print("pyarrow is not installed; skipping the Parquet tables")
+
+
+def write_index(output_dir, jobs):
+    links = ''.join(f'<li><a href="{job["name"]}.html">{job["name"]}</a></li>' for job in jobs)
+    with open(os.path.join(output_dir, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(f'<html><body><h1>DMT Report</h1><ul><li><a href="summary.html">summary</a></li>{links}</ul></body></html>')
+
+
+def write_report(df, files, output_dir, workers=1, png=False, force=False, sample_points=500,
+                 gof_threshold=GOF_THRESHOLD):
+    """Write the report for a site table and files table into output_dir.
+
+    Figures are drawn in up to ``workers`` processes; jobs whose input rows
+    and parameters match the previous run's manifest (and whose files still
+    exist) are skipped unless ``force`` is set. Returns the number of
+    figures drawn.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    if png and kaleido is None:
+        print("kaleido is not installed; writing HTML only")
+        png = False
+
+    manifest = {} if force else load_manifest(output_dir)
+    profiles = wafer_profiles(df, files)
+    jobs = report_jobs(df, files, sample_points=sample_points, gof_threshold=gof_threshold, profiles=profiles)
+    todo = [job for job in jobs
+            if manifest.get(job['name']) != job['fingerprint']
+            or not all(os.path.exists(path) for path in job_outputs(output_dir, job, png))]
+    print(f"Report: {len(jobs) - len(todo)} figures unchanged, {len(todo)} to draw")
+
+    write_plotlyjs(output_dir)
+    workers = min(workers or 1, len(todo))
+    tasks = [(job, output_dir, png) for job in todo]
+    if workers <= 1:
+        done = map(_render, tasks)
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        done = pool.map(_render, tasks, chunksize=max(1, len(tasks) // (workers * 4)))
+    try:
+        fingerprints = {job['name']: job['fingerprint'] for job in todo}
+        for name in done:
+            manifest[name] = fingerprints[name]
+    finally:
+        if workers > 1:
+            pool.shutdown()
+
+    summary = summarize(df, files, gof_threshold=gof_threshold)
+    hashes = RowHashes(df, files)
+    all_rows = np.arange(len(df))
+    table_fingerprints = {
+        'sites': fingerprint(hashes.rows(df.columns, all_rows), 'sites'),
+        'files': fingerprint(pd.util.hash_pandas_object(files[FILE_COLUMNS], index=False).to_numpy(), 'files'),
+        'summary': fingerprint(hashes.rows(df.columns, all_rows), 'summary', gof_threshold),
+    }
+    if profiles is not None:
+        table_fingerprints['profiles'] = fingerprint(hashes.rows(PROFILE_COLUMNS, all_rows), 'profiles')
+    write_tables(output_dir, df, files, summary, manifest, table_fingerprints, profiles)
+    write_index(output_dir, jobs)
+    save_manifest(output_dir, manifest)
+    return len(todo)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Write the DMT analyses as static HTML/PNG and Parquet files')
+    parser.add_argument('output_dir')
+    parser.add_argument('dirs', nargs='+', help='directories to search for DMT XML files')
+    parser.add_argument('--pattern', action='append', help='file name glob (repeatable)')
+    parser.add_argument('--start', help='first file date, e.g. 2025-07-01')
+    parser.add_argument('--end', help='last file date')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='worker processes')
+    parser.add_argument('--cache-dir', help='parse cache directory (default: none)')
+    parser.add_argument('--engine', choices=list(PARSER_ENGINES), default=DEFAULT_ENGINE, help='XML parser engine')
+    parser.add_argument('--read-threads', type=int, default=0, help='threads reading files ahead of the parser')
+    parser.add_argument('--png', action='store_true', help='also write PNG images (needs kaleido)')
+    parser.add_argument('--force', action='store_true', help='redraw figures even if their data is unchanged')
+    args = parser.parse_args(argv)
+
+    index = filter_file_index(build_file_index(args.dirs), patterns=args.pattern, start=args.start, end=args.end)
+    files = index['full_path'].tolist()
+    print(f"Found {len(files)} XML files to process")
+    cache = ParseCache(args.cache_dir) if args.cache_dir and ParseCache.available() else None
+    df, processed_files = ingest_files(files, workers=args.workers, cache=cache, engine=args.engine,
+                                       read_threads=args.read_threads)
+    write_report(df, processed_files, args.output_dir, workers=args.workers, png=args.png, force=args.force)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""Parquet dataset of parsed site rows, partitioned by DMT tool and day.
+
+The rows are kept like the parse cache's, but each save writes its rows to
+one part file per (tool, day) under
+``<root>/sites-v2/dmt=<tool>/day=<YYYY-MM-DD>/`` (merging that day's small
+parts into it), and the manifest records the part holding each file's rows.
+Only the most recent ``window_days`` days need to stay in memory: older rows
+are read back on demand, and a read only opens the part files of the tools
+and days it asks for, and only the columns it needs from them.
+"""
+import os
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+from dmt_cache import ParseCache
+from dmt_derived import DERIVED_COLUMNS, add_derived_columns
+from dmt_metrics import metrics
+
+# Bump when the layout of the stored tables changes; older stores are ignored
+STORE_VERSION = 2
+
+# Day partition of files without a ProcTime; they are always kept in memory
+UNDATED = 'undated'
+
+
+def file_days(files):
+    """Day partition ('YYYY-MM-DD', or UNDATED) of each file of a files table"""
+    return files['datetime'].dt.strftime('%Y-%m-%d').fillna(UNDATED).to_numpy(object)
+
+
+class SiteStore(ParseCache):
+    """ParseCache keeping its rows in a tool/day partitioned Parquet dataset.
+
+    It is passed to ingest_files in place of a ParseCache, but ``get`` only
+    loads the rows of the files in the in-memory window (see
+    ``window_start``). ``evict`` drops the rows that fall out of the window
+    as newer files arrive, and ``query`` reads days before it from disk.
+    """
+
+    def __init__(self, root, window_days=14):
+        super().__init__(root)
+        self.window_days = window_days
+        self.files_path = os.path.join(root, f'files-v{STORE_VERSION}.parquet')
+        self.records_dir = os.path.join(root, f'sites-v{STORE_VERSION}')
+
+    def _partitions(self, files):
+        return np.array([f'dmt={quote(str(dmt), safe="")}/day={day}'
+                         for dmt, day in zip(files['dmt'], file_days(files))], dtype=object)
+
+    def window_start(self, files, newest=None):
+        """First day kept in memory: window_days back from the newest file of a files table.
+
+        ``newest`` overrides the newest file's date/time; None if neither is known.
+        """
+        if newest is None and len(files):
+            newest = files['datetime'].max()
+        if newest is None or pd.isna(newest):
+            return None
+        return newest.normalize() - pd.Timedelta(days=self.window_days - 1)
+
+    def in_window(self, files, newest=None):
+        """Boolean mask of the files of a files table whose rows are kept in memory"""
+        start = self.window_start(files, newest)
+        if start is None:
+            return np.ones(len(files), dtype=bool)
+        dates = files['datetime']
+        return (dates.isna() | (dates >= start)).to_numpy()
+
+    def get(self, paths):
+        """Return the stored ``(df, files)`` pair for paths, or None if there is none.
+
+        The files table has every stored file of paths, but df only the rows
+        of those in the window; the rest stay on disk.
+        """
+        files = self._entries(paths)
+        if not len(files):
+            return None
+        with metrics.span('store_read') as counts:
+            df = self._read(files, self.in_window(files), counts=counts)
+        return df, files
+
+    def evict(self, df, files, newest=None):
+        """Rows of df whose files are still in the window of a files table (see window_start)"""
+        keep = self.in_window(files, newest)
+        if keep.all():
+            return df
+        with metrics.span('store_evict') as counts:
+            rows = df[keep[df['file_key'].to_numpy()]].reset_index(drop=True)
+            counts.update(sites=len(df) - len(rows))
+        return rows
+
+    def query(self, files, wanted=None, columns=None, where=None):
+        """Site rows of the files of a files table selected by the mask ``wanted`` (None = all) that are only on disk.
+
+        Only the part files of those files' tools and days are read, and
+        only the site ``columns`` asked for (None = all, derived columns
+        included) plus file_key. ``where`` is a list of (column, values)
+        pairs of stored site columns; only the rows matching all of them are
+        read. The rows of files in the window are not returned, they are in
+        memory already.
+        """
+        outside = ~self.in_window(files)
+        wanted = outside if wanted is None else outside & wanted
+
+        read_columns = None
+        if columns is not None:
+            # Derived columns are computed from the coordinates after reading
+            read_columns = set(columns) - set(DERIVED_COLUMNS) | {'full_path'}
+            if any(name in DERIVED_COLUMNS for name in columns):
+                read_columns |= {'XWaferLoc', 'YWaferLoc'}
+        with metrics.span('store_query') as counts:
+            rows = self._read(files, wanted, read_columns, counts, where)
+            if columns is None or any(name in DERIVED_COLUMNS for name in columns):
+                rows = add_derived_columns(rows)
+            if columns is not None:
+                rows = rows[['file_key'] + [name for name in columns if name in rows.columns and name != 'file_key']]
+        return rows
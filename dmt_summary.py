@@ -0,0 +1,64 @@
+import pandas as pd
+
+from dmt_frames import file_column, measurement_columns
+
+# Sites with a Goodness-of-Fit below this are counted as poor fits
+GOF_THRESHOLD = 0.95
+
+PERCENTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+# Group name for the file date; other names are site or files table columns
+DAY_GROUP = 'day'
+
+STAT_NAMES = {'count': 'Count', 'mean': 'Mean', 'std': 'Std Dev', 'min': 'Min', 'max': 'Max'}
+
+
+def percentile_name(p):
+    return 'Median' if p == 0.5 else f'P{round(p * 100)}'
+
+
+def group_key(df, files, name):
+    """Per-row grouping values for name: a site column, a files column or 'day'"""
+    if name == DAY_GROUP:
+        days = files['datetime'].dt.strftime('%Y-%m-%d')
+        return file_column(df, files.assign(day=days), DAY_GROUP)
+    if name in df.columns:
+        return df[name]
+    return file_column(df, files, name)
+
+
+def summarize(df, files, by=('WaferID',), labels=None, gof_threshold=GOF_THRESHOLD, percentiles=PERCENTILES):
+    """Statistics of every measurement label per group, from one groupby.
+
+    Returns one row per (group, label) with count, mean, std, min, max,
+    percentiles and range, plus how many sites of the group have a
+    Goodness-of-Fit below ``gof_threshold``. ``by`` names the grouping:
+    site table columns such as WaferID or dmt, files columns such as LotID,
+    or 'day' for the file date.
+    """
+    by = list(by)
+    labels = measurement_columns(df) if labels is None else list(labels)
+    columns = by + ['Measurement'] + list(STAT_NAMES.values()) + [percentile_name(p) for p in percentiles] + ['Range', 'Low GoF']
+    if df.empty or not labels:
+        return pd.DataFrame(columns=columns)
+
+    data = df[labels].copy()
+    data['Low GoF'] = df['Goodness-of-Fit'] < gof_threshold if 'Goodness-of-Fit' in df.columns else False
+    grouped = data.groupby([group_key(df, files, name) for name in by], observed=True, sort=True)
+
+    stats = grouped[labels].agg(list(STAT_NAMES))
+    quantiles = grouped[labels].quantile(list(percentiles)).unstack(-1)
+    low_gof = grouped['Low GoF'].sum()
+
+    parts = []
+    for label in labels:
+        part = stats[label].rename(columns=STAT_NAMES)
+        for p in percentiles:
+            part[percentile_name(p)] = quantiles[(label, p)]
+        part['Range'] = part['Max'] - part['Min']
+        part['Low GoF'] = low_gof
+        part.insert(0, 'Measurement', label)
+        parts.append(part[part['Count'] > 0])
+
+    summary = pd.concat(parts).reset_index()
+    return summary.sort_values(by + ['Measurement'], kind='stable', ignore_index=True)[columns]
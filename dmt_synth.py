@@ -0,0 +1,144 @@
+"""Generate synthetic DMT XML files for testing and benchmarks.
+
+Usage::
+
+    python dmt_synth.py OUTPUT_DIR --files 1000 [--wafers 4] [--sites 52] [--seed 0]
+
+Files follow the Envelope/Body/Context/RecordList/DataRecord layout and
+the file naming of the real DMT output, so the whole pipeline (index,
+ingest, summary, figures) runs on them unchanged.
+"""
+import argparse
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# Labels written for every site, in file order; XPos/YPos repeat the site coordinates
+DEFAULT_LABELS = ('XPos', 'YPos', 'Layer 1 Thickness', 'Layer 1 Index', 'Goodness-of-Fit', 'Residual')
+
+TOOLS = ('DMT102', 'DMT103')
+
+WAFER_RADIUS_MM = 150.0
+
+
+def site_layout(sites, edge_mm=147.0):
+    """x, y (mm) of a site layout: a center site and rings of sites out to edge_mm"""
+    x, y = [0.0], [0.0]
+    rings = max(1, int(np.ceil((np.sqrt(1 + 4 * (sites - 1) / 3) - 1) / 2)))  # hexagonal ring count
+    ring = 1
+    while len(x) < sites:
+        radius = edge_mm * ring / rings
+        count = min(6 * ring, sites - len(x))
+        angles = np.linspace(0, 2 * np.pi, count, endpoint=False) + ring * 0.3
+        x.extend(radius * np.cos(angles))
+        y.extend(radius * np.sin(angles))
+        ring += 1
+    return np.round(np.array(x), 4), np.round(np.array(y), 4)
+
+
+def label_values(label, x, y, rng):
+    """Plausible values of a label at the sites"""
+    n = len(x)
+    r = np.hypot(x, y) / WAFER_RADIUS_MM
+    if label == 'XPos':
+        return x
+    if label == 'YPos':
+        return y
+    if label == 'Layer 1 Thickness':
+        # Bowl-shaped profile with an edge roll-off
+        return np.round(34600 + 150 * r ** 2 - 40000 * np.clip(r - 0.9, 0, None) ** 2 + rng.normal(0, 15, n), 2)
+    if label == 'Goodness-of-Fit':
+        gof = 1 - np.abs(rng.normal(0, 0.01, n))
+        low = rng.random(n) < 0.02
+        gof[low] = rng.uniform(0.6, 0.95, low.sum())
+        return np.round(gof, 7)
+    if label == 'Layer 1 Index':
+        return np.round(1.537 + rng.normal(0, 0.002, n), 6)
+    if label == 'Residual':
+        return np.round(np.abs(rng.normal(0, 0.01, n)), 7)
+    return np.round(rng.normal(0, 1, n), 6)
+
+
+def dmt_xml(wafer_ids, slots, x, y, labels, context, rng):
+    """XML text of one DMT file"""
+    parts = ['<Envelope xmlns:dt="urn:schemas-microsoft-com:datatypes"><Body><Context>']
+    parts.extend(f'<{name}>{value}</{name}>' for name, value in context.items())
+    parts.append('<WaferList>')
+    parts.extend(f'<WaferID>{wafer_id}</WaferID>' for wafer_id in wafer_ids)
+    parts.append('</WaferList></Context><RecordList>')
+    parts.append(f"<SystemComment>Slots Processed: {','.join(map(str, slots))}</SystemComment>")
+    parts.append(f"<SystemComment>Lot ID: {context['LotID']}</SystemComment>")
+
+    index = 1
+    for wafer_id, slot in zip(wafer_ids, slots):
+        values = {label: label_values(label, x, y, rng) for label in labels}
+        for site in range(len(x)):
+            loc = f'<XWaferLoc>{x[site]}</XWaferLoc><YWaferLoc>{y[site]}</YWaferLoc>'
+            for label in labels:
+                parts.append(
+                    f'<DataRecord><SIndex>{index}</SIndex><WaferID>{wafer_id}</WaferID><Filter />'
+                    f'<Label>{label}</Label><Slot>{slot}</Slot><Datum>{values[label][site]}</Datum>'
+                    f"{'' if label in ('XPos', 'YPos') else loc}</DataRecord>"
+                )
+                index += 1
+    parts.append('</RecordList></Body></Envelope>')
+    return ''.join(parts)
+
+
+def generate_files(output_dir, files=10, wafers=4, sites=52, labels=DEFAULT_LABELS, seed=0,
+                   start=datetime(2025, 7, 1), interval=timedelta(minutes=7)):
+    """Write synthetic DMT files into output_dir and return their paths.
+
+    Files alternate between the DMT tools and are spaced ``interval`` apart
+    from ``start``; each has ``wafers`` wafers with ``sites`` sites and one
+    DataRecord per label and site. The same arguments give the same files.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    x, y = site_layout(sites)
+    paths = []
+    for i in range(files):
+        tool = TOOLS[i % len(TOOLS)]
+        when = start + i * interval
+        lot = f'SY{i // 25:06d}'
+        operation = ('8333', '8281')[i % 2]
+        recipe = ('\\LITHO_5051\\NOPAT_SI\\TSMR-IN009-52PT_R2', '\\LITHO_5051\\NOPAT_SI\\XHRIC_52PT')[i % 2]
+        test_name = ('5051IN009THK', 'DMTDUMMY')[i % 2]
+        context = {
+            'Entity': tool,
+            'SessionID': f'{when:%Y%m%d%H%M%S}000_{lot}_{operation}_TNI111_{test_name}',
+            'TestName': test_name,
+            'F4Entity': 'TNI111',
+            'LotID': lot,
+            'Operation': operation,
+            'RecipeName': recipe,
+            'RunId': f'{9000000000 + i}_{tool}_{when:%Y%m%d%H%M%S}',
+            'ProcTime': f'{when.month}/{when.day}/{when.year} {when:%I:%M:%S %p}'.replace(' 0', ' ', 1),
+        }
+        wafer_ids = [f'SYN{i:07d}W{w:02d}' for w in range(wafers)]
+        slots = [w % 25 + 1 for w in range(wafers)]
+        name = f'{when:%Y-%m-%dT%H.%M.%S}.{i % 10000000:07d}-{lot}-{operation}-{tool}-TNI111-{test_name}.xml'
+        path = os.path.join(output_dir, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(dmt_xml(wafer_ids, slots, x, y, labels, context, rng))
+        paths.append(path)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Write synthetic DMT XML files')
+    parser.add_argument('output_dir')
+    parser.add_argument('--files', type=int, default=10)
+    parser.add_argument('--wafers', type=int, default=4)
+    parser.add_argument('--sites', type=int, default=52)
+    parser.add_argument('--labels', nargs='+', default=list(DEFAULT_LABELS))
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    paths = generate_files(args.output_dir, files=args.files, wafers=args.wafers, sites=args.sites,
+                           labels=args.labels, seed=args.seed)
+    print(f"Wrote {len(paths)} files to {args.output_dir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# One term of a DataTable filter_query, e.g. {dmt_type} contains DMT102 or
+# {Mean} >= 1.5; an i/s prefix makes the comparison case (in)sensitive
+_FILTER_TERM = re.compile(
+    r'^\s*\{(?P<column>[^}]+)\}\s*'
+    r'(?P<case>[is]?)(?P<op>contains|datestartswith|eq|ne|lt|le|gt|ge|>=|<=|!=|=|<|>)\s*'
+    r'(?P<value>.*?)\s*$'
+)
+
+_OPERATORS = {'eq': '=', 'ne': '!=', 'lt': '<', 'le': '<=', 'gt': '>', 'ge': '>='}
+
+
+def parse_filter_query(query):
+    """Split a DataTable filter_query into (column, operator, value, case_sensitive) terms.
+
+    Terms are joined with &&; quoted values are unquoted and other values
+    are kept as text. Terms that can't be parsed are skipped.
+    """
+    terms = []
+    for part in (query or '').split(' && '):
+        match = _FILTER_TERM.match(part)
+        if not match:
+            continue
+        value = match['value']
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'`':
+            value = value[1:-1].replace('\\' + value[0], value[0])
+        terms.append((match['column'], _OPERATORS.get(match['op'], match['op']), value, match['case'] != 'i'))
+    return terms
+
+
+def _term_mask(column, op, value, case_sensitive):
+    if op in ('contains', 'datestartswith') or not pd.api.types.is_numeric_dtype(column):
+        text = column.astype(str)
+        if not case_sensitive:
+            text, value = text.str.lower(), value.lower()
+        if op == 'contains':
+            return text.str.contains(value, regex=False).to_numpy()
+        if op == 'datestartswith':
+            return text.str.startswith(value).to_numpy()
+        column = text
+    else:
+        try:
+            value = float(value)
+        except ValueError:
+            return np.zeros(len(column), dtype=bool)
+    if op == '=':
+        return (column == value).to_numpy()
+    if op == '!=':
+        return (column != value).to_numpy()
+    if op == '<':
+        return (column < value).to_numpy()
+    if op == '<=':
+        return (column <= value).to_numpy()
+    if op == '>':
+        return (column > value).to_numpy()
+    return (column >= value).to_numpy()
+
+
+class IndexedTable:
+    """In-memory table answering DataTable page, sort and filter requests.
+
+    The sort order of each column is computed once, the first time the
+    column is sorted on, and reused for every later page, so a request
+    only costs the filter mask and taking the rows of one page.
+    """
+
+    def __init__(self, table):
+        self.table = table.reset_index(drop=True)
+        self._orders = {}
+
+    def __len__(self):
+        return len(self.table)
+
+    def order(self, column):
+        """Row positions of the table sorted ascending by column (missing values last)"""
+        if column not in self._orders:
+            self._orders[column] = self.table[column].argsort(kind='stable').to_numpy()
+        return self._orders[column]
+
+    def mask(self, filter_query):
+        """Rows matching a filter_query, or None when nothing is filtered"""
+        mask = None
+        for column, op, value, case_sensitive in parse_filter_query(filter_query):
+            if column not in self.table.columns:
+                continue
+            term = _term_mask(self.table[column], op, value, case_sensitive)
+            mask = term if mask is None else mask & term
+        return mask
+
+    def query(self, filter_query='', sort_by=(), page=0, page_size=20):
+        """One page of rows for a DataTable request, plus the number of matching rows.
+
+        sort_by is the DataTable sort_by list of {'column_id', 'direction'};
+        a single column uses its cached order, several columns sort the
+        filtered rows.
+        """
+        mask = self.mask(filter_query)
+        sort_by = [sort for sort in sort_by or () if sort['column_id'] in self.table.columns]
+        if len(sort_by) == 1:
+            positions = self.order(sort_by[0]['column_id'])
+            if sort_by[0]['direction'] == 'desc':
+                # Keep missing values last when reversing
+                missing = self.table[sort_by[0]['column_id']].isna().to_numpy()[positions]
+                positions = np.concatenate([positions[~missing][::-1], positions[missing]])
+            if mask is not None:
+                positions = positions[mask[positions]]
+        else:
+            positions = np.arange(len(self.table)) if mask is None else np.flatnonzero(mask)
+            if sort_by:
+                rows = self.table.iloc[positions]
+                rows = rows.sort_values([sort['column_id'] for sort in sort_by],
+                                        ascending=[sort['direction'] == 'asc' for sort in sort_by],
+                                        kind='stable', na_position='last')
+                positions = rows.index.to_numpy()
+
+        start = page * page_size
+        return self.table.iloc[positions[start:start + page_size]], len(positions)
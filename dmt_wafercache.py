@@ -0,0 +1,67 @@
+import collections
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+class WaferCache:
+    """Per-wafer results kept by file (path and date/time) and WaferID.
+
+    Subclasses pick the site rows a wafer's result is computed from
+    (``usable``) and compute a batch of wafers at once (``compute``);
+    ``get`` computes only the wafers it hasn't seen, in one batch, so
+    redrawing a page or adding new files costs only the new wafers. With
+    ``max_items`` the least recently used results beyond it are dropped.
+    ``get`` may be called from several threads (Dash callbacks).
+    """
+
+    def __init__(self, label, max_items=None):
+        self.label = label
+        self.max_items = max_items
+        self._items = collections.OrderedDict()  # (path, datetime, WaferID) -> result
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def usable(self, rows):
+        """Boolean mask of the site rows results are computed from"""
+        return rows[self.label].notna().to_numpy()
+
+    def compute(self, rows, wafers):
+        """One result per wafer, each given as the positions of its rows in ``rows``"""
+        raise NotImplementedError
+
+    def get(self, rows, files):
+        """Results of the wafers in a site table.
+
+        Returns a frame with one row per file and wafer in ``rows`` (its
+        file_key, dmt, WaferID and number of usable sites) and the list of
+        results aligned with it.
+        """
+        rows = rows[self.usable(rows)]
+        groups = rows.groupby(['file_key', 'WaferID'], observed=True).indices
+        table = pd.DataFrame(list(groups), columns=['file_key', 'WaferID'])
+        file_keys = table['file_key'].to_numpy()
+        keys = list(zip(files['full_path'].to_numpy()[file_keys], files['datetime'].to_numpy()[file_keys],
+                        table['WaferID']))
+
+        with self._lock:
+            missing = [i for i, key in enumerate(keys) if key not in self._items]
+            if missing:
+                positions = list(groups.values())
+                results = self.compute(rows, [positions[i] for i in missing])
+                self._items.update((keys[i], result) for i, result in zip(missing, results))
+
+            # Move the requested results to the end so the oldest ones are dropped first
+            for key in keys:
+                self._items.move_to_end(key)
+            results = [self._items[key] for key in keys]
+            if self.max_items is not None:
+                while len(self._items) > self.max_items:
+                    self._items.popitem(last=False)
+
+        table.insert(1, 'dmt', files['dmt'].to_numpy()[file_keys])
+        table['sites'] = np.array([len(positions) for positions in groups.values()], dtype=np.int64)
+        return table, results
@@ -0,0 +1,116 @@
+"""Wafer maps: a label's site values interpolated onto a fixed grid over the wafer.
+
+Interpolation is linear within the triangulation of the sites and takes the
+nearest site between the outermost sites and the wafer edge. For a given
+site layout it is a fixed sparse matrix from site values to grid values, so
+it is built once per layout (site_key set) and every wafer with that layout
+is mapped with one matrix product.
+"""
+import functools
+
+import numpy as np
+from scipy import sparse
+from scipy.spatial import Delaunay, QhullError, cKDTree
+
+from dmt_derived import site_coordinates
+from dmt_wafercache import WaferCache
+
+MAP_LABELS = ('Layer 1 Thickness', 'Goodness-of-Fit')
+
+WAFER_RADIUS_MM = 150.0
+
+# Grid points along each axis of the 300 mm square the maps cover (3 mm apart)
+MAP_POINTS = 101
+
+
+def map_axis(points=MAP_POINTS):
+    """x (and y) coordinates in mm of a map's grid columns (rows)"""
+    return np.linspace(-WAFER_RADIUS_MM, WAFER_RADIUS_MM, points)
+
+
+@functools.lru_cache(maxsize=64)
+def _interpolator(site_keys, points):
+    """Sparse (grid points, sites) interpolation matrix of a layout and the mask of grid points on the wafer"""
+    x, y = site_coordinates(np.frombuffer(site_keys, dtype=np.int64))
+    sites = np.column_stack([x, y])
+    gx, gy = np.meshgrid(map_axis(points), map_axis(points))
+    grid = np.column_stack([gx.ravel(), gy.ravel()])
+    on_wafer = np.hypot(grid[:, 0], grid[:, 1]) <= WAFER_RADIUS_MM
+
+    rows, cols, weights = [], [], []
+    nearest = on_wafer.copy()
+    if len(sites) >= 3:
+        try:
+            triangulation = Delaunay(sites)
+        except QhullError:
+            # Collinear sites: nearest site everywhere
+            triangulation = None
+        if triangulation is not None:
+            simplex = triangulation.find_simplex(grid)
+            inside = np.flatnonzero(on_wafer & (simplex >= 0))
+            transform = triangulation.transform[simplex[inside]]
+            b = np.einsum('ijk,ik->ij', transform[:, :2], grid[inside] - transform[:, 2])
+            rows.append(np.repeat(inside, 3))
+            cols.append(triangulation.simplices[simplex[inside]].ravel())
+            weights.append(np.column_stack([b, 1 - b.sum(axis=1)]).ravel())
+            nearest[inside] = False
+    outside = np.flatnonzero(nearest)
+    rows.append(outside)
+    cols.append(cKDTree(sites).query(grid[outside])[1])
+    weights.append(np.ones(len(outside)))
+
+    matrix = sparse.csr_matrix((np.concatenate(weights), (np.concatenate(rows), np.concatenate(cols))),
+                               shape=(len(grid), len(sites)))
+    return matrix, on_wafer
+
+
+def interpolate_maps(groups, points=MAP_POINTS):
+    """Map a list of (site keys, values) arrays, one per wafer; returns a (wafers, points, points) array.
+
+    Values at the same site are averaged. Grid points off the wafer are
+    NaN, as are the maps of wafers without sites.
+    """
+    maps = np.full((len(groups), points, points), np.nan, dtype=np.float32)
+    layouts = {}  # site keys -> [(group, site values)]
+    for i, (keys, values) in enumerate(groups):
+        site_keys, inverse, counts = np.unique(np.asarray(keys, dtype=np.int64), return_inverse=True,
+                                               return_counts=True)
+        if len(site_keys):
+            means = np.bincount(inverse, np.asarray(values, dtype=np.float64)) / counts
+            layouts.setdefault(site_keys.tobytes(), []).append((i, means))
+
+    for site_keys, wafers in layouts.items():
+        matrix, on_wafer = _interpolator(site_keys, points)
+        values = matrix @ np.column_stack([means for _, means in wafers])
+        values[~on_wafer] = np.nan
+        maps[[i for i, _ in wafers]] = values.T.reshape(-1, points, points)
+    return maps
+
+
+class WaferMapCache(WaferCache):
+    """Maps of one label kept by file (path and date/time) and WaferID (see WaferCache).
+
+    New wafers are interpolated in one batch per site layout; the least
+    recently used maps beyond ``max_maps`` are dropped.
+    """
+
+    def __init__(self, label, points=MAP_POINTS, max_maps=5000):
+        super().__init__(label, max_items=max_maps)
+        self.points = points
+
+    def usable(self, rows):
+        return (rows[self.label].notna() & (rows['site_key'] >= 0)).to_numpy()
+
+    def compute(self, rows, wafers):
+        site_keys, values = rows['site_key'].to_numpy(), rows[self.label].to_numpy()
+        return interpolate_maps([(site_keys[positions], values[positions]) for positions in wafers], self.points)
+
+    def get(self, rows, files):
+        """Maps of the wafers in a site table.
+
+        Returns a frame with one row per file and wafer in ``rows`` (its
+        file_key, dmt, WaferID and number of sites) and the maps array
+        aligned with it.
+        """
+        table, maps = super().get(rows, files)
+        return table, np.array(maps).reshape(len(maps), self.points, self.points)
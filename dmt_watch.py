@@ -0,0 +1,71 @@
+import os
+
+import pandas as pd
+
+from dmt_index import INDEX_COLUMNS, build_file_index
+
+
+class DirectoryWatcher:
+    """Detect XML files that appear in a set of directories.
+
+    A poll only stats each directory; a directory is listed again only when
+    its modification time has changed, so polling costs next to nothing
+    while no new files arrive. Files that fail to parse (typically because
+    the tool was still writing them) can be handed back with ``retry`` and
+    are offered again on the next polls, up to ``max_retries`` times.
+    """
+
+    def __init__(self, dirs, max_retries=3):
+        self.dirs = list(dirs)
+        self.max_retries = max_retries
+        self._dir_mtimes = {}
+        self._known = set()
+        self._pending = {}  # path -> index row of files to offer again
+        self._attempts = {}
+
+    def _stat_dirs(self, dirs):
+        mtimes = {}
+        for d in dirs:
+            try:
+                mtimes[d] = os.stat(d).st_mtime_ns
+            except OSError:
+                mtimes[d] = None
+        return mtimes
+
+    def scan(self):
+        """List every directory and return the full file index"""
+        # Stat before listing: a file landing in between shows up on the next poll
+        self._dir_mtimes = self._stat_dirs(self.dirs)
+        index = build_file_index(self.dirs)
+        self._known = set(index['full_path'])
+        return index
+
+    def poll(self):
+        """Return the index rows of files that appeared since the last scan or poll"""
+        mtimes = self._stat_dirs(self.dirs)
+        changed = [d for d in self.dirs if mtimes[d] is not None and mtimes[d] != self._dir_mtimes.get(d)]
+        self._dir_mtimes = mtimes
+
+        frames = []
+        if self._pending:
+            frames.append(pd.DataFrame(list(self._pending.values()), columns=INDEX_COLUMNS))
+            self._pending = {}
+        if changed:
+            index = build_file_index(changed)
+            new = index[~index['full_path'].isin(self._known)]
+            self._known.update(new['full_path'])
+            frames.append(new)
+
+        if not frames:
+            return pd.DataFrame(columns=INDEX_COLUMNS)
+        return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+    def retry(self, index):
+        """Offer the files in index again on the next poll"""
+        for row in index.itertuples(index=False):
+            attempts = self._attempts.get(row.full_path, 0) + 1
+            self._attempts[row.full_path] = attempts
+            if attempts <= self.max_retries:
+                self._pending[row.full_path] = row
+            else:
+                print(f"Giving up on {row.full_path} after {attempts} attempts")
@@ -0,0 +1,79 @@
+import glob
+import gzip
+import os
+import shutil
+import sys
+import tempfile
+import zipfile
+
+from dmt_cache import ParseCache
+from dmt_index import build_file_index
+from dmt_ingest import ingest_files
+
+# Check that gzipped files and zip members are indexed and parsed like the
+# plain sample files next to this script
+here = os.path.dirname(os.path.abspath(__file__))
+sample_files = sorted(glob.glob(os.path.join(here, '*.xml')))
+print(f"Sample files: {len(sample_files)}")
+
+# How each sample is packed: as a gzip file or as a plain or gzipped zip member
+LAYOUTS = [
+    ('gzip file, gzipped zip member', ['gz', 'zip-gz']),
+    ('plain zip members', ['zip', 'zip']),
+]
+
+
+def pack(sample_files, forms, packed_dir):
+    os.makedirs(packed_dir)
+    with zipfile.ZipFile(os.path.join(packed_dir, 'bundle.zip'), 'w', zipfile.ZIP_DEFLATED) as zf:
+        for path, form in zip(sample_files, forms):
+            name = os.path.basename(path)
+            with open(path, 'rb') as f:
+                data = f.read()
+            if form == 'gz':
+                with gzip.open(os.path.join(packed_dir, name + '.gz'), 'wb') as g:
+                    g.write(data)
+            elif form == 'zip-gz':
+                zf.writestr(f'2025/{name}.gz', gzip.compress(data))
+            else:
+                zf.writestr(f'2025/{name}', data)
+
+
+tmp = tempfile.mkdtemp()
+try:
+    plain_dir = os.path.join(tmp, 'plain')
+    os.makedirs(plain_dir)
+    for path in sample_files:
+        shutil.copy(path, plain_dir)
+    plain_index = build_file_index([plain_dir])
+    plain_df, plain_files = ingest_files(sorted(plain_index['full_path']))
+
+    failures = 0
+    for n, (layout, forms) in enumerate(LAYOUTS):
+        packed_dir = os.path.join(tmp, f'packed{n}')
+        pack(sample_files, forms, packed_dir)
+        packed_index = build_file_index([packed_dir])
+        print(f"\n{layout}:")
+        print(packed_index[['filename', 'full_path', 'LotID', 'dmt']].to_string())
+        same_meta = (plain_index.drop(columns=['filename', 'full_path']).sort_values('timestamp').reset_index(drop=True)
+                     .equals(packed_index.drop(columns=['filename', 'full_path']).sort_values('timestamp')
+                             .reset_index(drop=True)))
+        failures += not same_meta
+        print(f"Same filename metadata: {same_meta}")
+
+        cache = ParseCache(os.path.join(packed_dir, 'cache'))
+        for label, kwargs in [('serial', {}), ('prefetch', {'read_threads': 4}), ('cached', {'cache': cache}),
+                              ('cache hits', {'cache': cache})]:
+            # Sorting by timestamp puts the files in the same order as the plain ones
+            paths = packed_index.sort_values('timestamp')['full_path'].tolist()
+            df, files = ingest_files(paths, **kwargs)
+            same = (df.equals(plain_df) and len(files) == len(plain_files)
+                    and files.drop(columns=['filename', 'full_path']).equals(plain_files.drop(columns=['filename', 'full_path'])))
+            failures += not same
+            print(f"{label:<10} {len(files)} files, {len(df)} sites  {'OK' if same else 'MISMATCH'}")
+finally:
+    shutil.rmtree(tmp)
+
+print(f"\n{'Archives read like plain files' if not failures else f'{failures} mismatches'}")
+if failures:
+    sys.exit(1)
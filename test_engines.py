@@ -0,0 +1,55 @@
+import glob
+import os
+import sys
+import time
+
+from dmt_parser import PARSER_ENGINES, WANTED_LABELS, iter_data_records
+
+# Check that every parser engine gives the same records and context as the
+# reference (etree) engine on the sample files next to this script
+here = os.path.dirname(os.path.abspath(__file__))
+sample_files = sorted(glob.glob(os.path.join(here, '*.xml')))
+print(f"Engines: {', '.join(PARSER_ENGINES)}")
+print(f"Sample files: {len(sample_files)}")
+
+
+def read(path, engine, labels):
+    context = {}
+    start = time.perf_counter()
+    records = list(iter_data_records(path, labels=labels, context=context, engine=engine))
+    return records, context, time.perf_counter() - start
+
+
+failures = 0
+for path in sample_files:
+    print(f"\n{os.path.basename(path)}")
+    for labels in (None, WANTED_LABELS):
+        reference, reference_context, _ = read(path, 'etree', labels)
+        for engine in PARSER_ENGINES:
+            records, context, seconds = read(path, engine, labels)
+            same = records == reference and context == reference_context
+            failures += not same
+            print(f"  labels={'all' if labels is None else 'wanted'} {engine:<6} "
+                  f"{len(records):>5} records {seconds * 1000:7.1f} ms  {'OK' if same else 'MISMATCH'}")
+
+    # Bytes and file objects give the same records as a path
+    with open(path, 'rb') as f:
+        data = f.read()
+    for engine in PARSER_ENGINES:
+        same = list(iter_data_records(data, engine=engine)) == list(iter_data_records(path, engine='etree'))
+        failures += not same
+        print(f"  from bytes {engine:<6} {'OK' if same else 'MISMATCH'}")
+
+    # A file cut off while the tool is still writing it is an error, not fewer records
+    for engine in PARSER_ENGINES:
+        try:
+            list(iter_data_records(data[:len(data) // 3], engine=engine))
+            rejected = False
+        except SyntaxError:  # ParseError of etree and lxml
+            rejected = True
+        failures += not rejected
+        print(f"  truncated  {engine:<6} {'OK' if rejected else 'ACCEPTED'}")
+
+print(f"\n{'All engines agree' if not failures else f'{failures} mismatches'}")
+if failures:
+    sys.exit(1)
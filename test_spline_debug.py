@@ -1,59 +1,14 @@
-import os
-import pandas as pd
-from datetime import datetime
-import xml.etree.ElementTree as ET
 import numpy as np
 from scipy.interpolate import UnivariateSpline
-import plotly.graph_objects as go
+
+from dmt_ingest import ingest_files
 
 # Test spline fitting with the example data
 file_path = r'c:\Users\strautma\PythonScripts\DMT-folder-GOF\2025-07-08T09.33.59.9790672-W525T8V0-8333-DMT102-TNI111-5051IN009THK.xml'
 
-records = []
-file_time = datetime.fromtimestamp(os.path.getmtime(file_path))
-dmt = 'DMT102'
-
-tree = ET.parse(file_path)
-root = tree.getroot()
-
-for data_record in root.findall('.//DataRecord'):
-    label = data_record.findtext('Label')
-    datum = data_record.findtext('Datum')
-    wafer_id = data_record.findtext('WaferID')
-    x_wafer_loc = data_record.findtext('XWaferLoc')
-    y_wafer_loc = data_record.findtext('YWaferLoc')
-    
-    if label in ['Layer 1 Thickness']:
-        try:
-            datum_val = float(datum)
-            location_id = f"{x_wafer_loc}_{y_wafer_loc}" if x_wafer_loc and y_wafer_loc else None
-            
-            # Calculate RADIUS
-            radius = None
-            if x_wafer_loc and y_wafer_loc:
-                try:
-                    x_val = float(x_wafer_loc)
-                    y_val = float(y_wafer_loc)
-                    radius = np.sqrt(x_val**2 + y_val**2)
-                except (ValueError, TypeError):
-                    radius = None
-            
-            records.append({
-                'datetime': file_time,
-                'Label': label,
-                'Datum': datum_val,
-                'dmt': dmt,
-                'WaferID': wafer_id,
-                'XWaferLoc': x_wafer_loc,
-                'YWaferLoc': y_wafer_loc,
-                'location_id': location_id,
-                'RADIUS': radius
-            })
-        except (TypeError, ValueError):
-            continue
-
-df = pd.DataFrame(records)
-thickness_data = df[(df['Label'] == 'Layer 1 Thickness') & (df['RADIUS'].notna())].copy()
+# RADIUS comes from the derived-columns stage that runs after load
+df, files = ingest_files([file_path])
+thickness_data = df[df['Layer 1 Thickness'].notna() & df['RADIUS'].notna()].copy()
 
 print(f"Total thickness records with RADIUS: {len(thickness_data)}")
 print(f"Unique WaferIDs: {thickness_data['WaferID'].nunique()}")
@@ -70,7 +25,7 @@ if len(wafer_data) >= 4:
         # Sort data by RADIUS
         sorted_data = wafer_data.sort_values('RADIUS')
         x_data = sorted_data['RADIUS'].values
-        y_data = sorted_data['Datum'].values
+        y_data = sorted_data['Layer 1 Thickness'].values
         
         print(f"X data range: {x_data.min():.2f} to {x_data.max():.2f}")
         print(f"Y data range: {y_data.min():.2f} to {y_data.max():.2f}")
@@ -101,3 +56,14 @@ if len(wafer_data) >= 4:
         print(f"Overall spline fitting failed: {e}")
 else:
     print("Not enough data points for spline fitting")
+
+# The production fit: sites of a ring share a radius, so dmt_profile averages
+# them per ring and picks the smoothing by GCV instead of trying factors
+from dmt_profile import PROFILE_RADII, fit_profile
+
+curve, metrics = fit_profile(wafer_data['RADIUS'], wafer_data['Layer 1 Thickness'])
+fitted = ~np.isnan(curve)
+print(f"\nProfile fit: {fitted.sum()} of {len(PROFILE_RADII)} grid radii "
+      f"({PROFILE_RADII[fitted].min():.1f} to {PROFILE_RADII[fitted].max():.1f} mm)")
+print(f"  Curve Y range: {curve[fitted].min():.2f} to {curve[fitted].max():.2f}")
+print(f"  Center to edge: {metrics[6]:.2f}, edge roll-off: {metrics[7]:.2f}")
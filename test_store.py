@@ -0,0 +1,72 @@
+import glob
+import os
+import sys
+import shutil
+import tempfile
+
+import pandas as pd
+
+from dmt_frames import concat_frames
+from dmt_ingest import ingest_files
+from dmt_store import SiteStore
+
+# Check that the site store gives back the rows of the sample files next to
+# this script: the newest day from memory, the older ones from disk
+here = os.path.dirname(os.path.abspath(__file__))
+sample_files = sorted(glob.glob(os.path.join(here, '*.xml')))
+print(f"Sample files: {len(sample_files)}")
+
+plain_df, plain_files = ingest_files(sample_files)
+print(plain_files[['filename', 'dmt', 'datetime']].to_string())
+
+
+
+def same_rows(df, expected):
+    """Equal frames, up to categories no row uses (rows read back only have the ones they use)"""
+    def trimmed(frame):
+        return frame.apply(lambda column: column.cat.remove_unused_categories()
+                           if isinstance(column.dtype, pd.CategoricalDtype) else column)
+    return df.columns.equals(expected.columns) and trimmed(df).equals(trimmed(expected))
+
+
+tmp = tempfile.mkdtemp()
+try:
+    failures = 0
+    for label in ('parsed', 'stored'):
+        store = SiteStore(os.path.join(tmp, 'store'), window_days=1)
+        df, files = ingest_files(sample_files, cache=store)
+        df = store.evict(df, files)
+        resident = store.in_window(files)
+        expected = plain_df[resident[plain_df['file_key'].to_numpy()]].reset_index(drop=True)
+        same = files.equals(plain_files) and same_rows(df, expected)
+        failures += not same
+        print(f"{label:<7} {resident.sum()} of {len(files)} files in memory from "
+              f"{store.window_start(files).date()}, {len(df)} sites  {'OK' if same else 'MISMATCH'}")
+
+    # Everything before the window, then just one tool's thickness column
+    older = store.query(files)
+    both = concat_frames([older, df]).sort_values('file_key', kind='stable').reset_index(drop=True)
+    same = same_rows(both, plain_df[both.columns])
+    failures += not same
+    print(f"query   {len(older)} sites from disk  {'OK' if same else 'MISMATCH'}")
+
+    wanted = (files['dmt'] == 'DMT102').to_numpy()
+    pruned = store.query(files, wanted, columns=['WaferID', 'Layer 1 Thickness'])
+    mask = (~resident & wanted)[plain_df['file_key'].to_numpy()]
+    same = same_rows(pruned, plain_df.loc[mask, pruned.columns].reset_index(drop=True))
+    failures += not same
+    print(f"pruned  columns {pruned.columns.tolist()}, {len(pruned)} sites  {'OK' if same else 'MISMATCH'}")
+
+    # Just one wafer's sites, picked while reading the Parquet parts
+    wafer = str(older['WaferID'].iloc[0])
+    picked = store.query(files, where=[('WaferID', [wafer])])
+    mask = ~resident[plain_df['file_key'].to_numpy()] & (plain_df['WaferID'] == wafer).to_numpy()
+    same = len(picked) > 0 and same_rows(picked, plain_df.loc[mask, picked.columns].reset_index(drop=True))
+    failures += not same
+    print(f"where   WaferID {wafer}, {len(picked)} sites  {'OK' if same else 'MISMATCH'}")
+finally:
+    shutil.rmtree(tmp)
+
+print(f"\n{'Store rows match the parsed rows' if not failures else f'{failures} mismatches'}")
+if failures:
+    sys.exit(1)